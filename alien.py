@@ -1,6 +1,7 @@
-import pygame # type: ignore
 from pygame.sprite import Sprite # type: ignore
 
+from assets import assets
+
 class Alien(Sprite):
     '''A class to represent a single alien in the fleet'''
 
@@ -13,7 +14,7 @@ class Alien(Sprite):
         self.settings = ai_game.settings
 
         # Load the alien image and set its rect attribute
-        self.image = pygame.image.load('images/alien.bmp')
+        self.image = assets.image('images/alien.bmp')
         self.rect = self.image.get_rect()
 
         # Start each new alien near the top left of the screen
@@ -26,7 +27,7 @@ class Alien(Sprite):
     def update(self):
         '''Move the alien to the right or left'''
         # Fleet_direction will represents left (-1) or right (1)
-        self.x += self.settings.alien_speed * self.settings.fleet_direction
+        self.x += self.settings.difficulty.alien_speed * self.settings.fleet_direction
         self.rect.x = self.x
 
     def check_edges(self):
@@ -0,0 +1,111 @@
+import pygame # type: ignore
+
+# Colorkey for RLE sprites - a color none of the images use
+COLORKEY = (255, 0, 255)
+
+class AssetRegistry:
+    '''A process-wide cache that loads each image once and shares its surface'''
+
+    def __init__(self):
+        '''Initialize an empty cache and its hit/miss counters'''
+        # {(path, alpha): surface}
+        self._images = {}
+        # {(name, size): font}
+        self._fonts = {}
+        self.hits = 0
+        self.misses = 0
+
+        # Optional RLE colorkey images, see prepare()
+        self.rle = False
+        self.background = None
+
+    def image(self, path, alpha=False):
+        '''Return the shared surface for path, loading it on first use'''
+        key = (path, alpha)
+        surface = self._images.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self._convert(pygame.image.load(path), alpha)
+        self._images[key] = surface
+        return surface
+
+    def font(self, name=None, size=48):
+        '''Return the shared font for (name, size), loading it on first use'''
+        key = (name, size)
+        font = self._fonts.get(key)
+        if font is not None:
+            self.hits += 1
+            return font
+
+        self.misses += 1
+        if name is None:
+            # SysFont(None) ends up here anyway, but only after scanning every system font
+            font = pygame.font.Font(None, size)
+        else:
+            font = pygame.font.SysFont(name, size)
+        self._fonts[key] = font
+        return font
+
+    def prepare(self, rle=False, background=None):
+        '''Set up display-format images once the screen exists (after set_mode)
+
+        rle=True turns images with per-pixel alpha into RLE-accelerated
+        colorkey images, blended onto the background color first so the
+        soft edges still look right on it.
+        '''
+        self.rle = rle and background is not None
+        self.background = background
+        # anything loaded before the display existed gets converted now
+        for key in list(self._images):
+            self._images[key] = self._convert(pygame.image.load(key[0]), key[1])
+
+    def to_display(self, surface, alpha=False):
+        '''Return surface in the display pixel format (unchanged with no display)'''
+        # convert() needs a display mode -> only convert once a screen exists
+        if pygame.display.get_surface() is None:
+            return surface
+        # per-pixel alpha would be lost by convert() -> transparent pixels turn black
+        if alpha or surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def stats(self):
+        '''Return the cache counters as a dictionary'''
+        return {'hits': self.hits, 'misses': self.misses, 'images': len(self._images),
+                'fonts': len(self._fonts)}
+
+    def clear(self):
+        '''Forget every cached surface and font and reset the counters'''
+        self._images.clear()
+        self._fonts.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _convert(self, surface, alpha):
+        '''Convert a freshly loaded image for fast blits'''
+        # a converted surface matches the display pixel format -> no conversion on each blit
+        if (self.rle and pygame.display.get_surface() is not None
+                and surface.get_flags() & pygame.SRCALPHA):
+            return self._colorkey_rle(surface)
+        return self.to_display(surface, alpha)
+
+    def _colorkey_rle(self, surface):
+        '''Blend surface onto the background, key out the transparent half and RLE-encode it'''
+        blended = pygame.Surface(surface.get_size())
+        blended.fill(self.background)
+        blended.blit(surface, (0, 0))
+
+        # pixels more than half transparent become the colorkey
+        transparent = pygame.mask.from_surface(surface, 127)
+        transparent.invert()
+        blended.blit(transparent.to_surface(setcolor=COLORKEY, unsetcolor=(0, 0, 0, 0)), (0, 0))
+
+        keyed = blended.convert()
+        keyed.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return keyed
+
+# Shared registry - every module imports this one instance
+assets = AssetRegistry()
@@ -0,0 +1,143 @@
+import asyncio
+from collections import deque
+from time import perf_counter_ns
+
+import pygame # type: ignore
+
+# Events that move the ship -> their latency is measured
+MOVE_KEYS = (pygame.K_LEFT, pygame.K_RIGHT)
+
+class AsyncGameLoop:
+    '''An asyncio main loop: input, simulation and rendering as cooperating tasks
+
+    The input task polls pygame and puts (event, arrival time) pairs on a
+    bounded queue (when it is full, events wait in pygame's queue), the
+    simulation task drains it at the start of every fixed tick, and the
+    render task draws at its own pace. No task ever
+    blocks the others - the ship-hit pause is the tick-counted pause_ticks
+    state in AlienInvasion.step().
+
+    Input latency = time from an arrow key event arriving to the end of
+    the tick that moved the ship with it.
+    '''
+
+    def __init__(self, ai_game, queue_size=64, poll_interval=0.001, window=600):
+        '''Wrap ai_game, queue_size = most events waiting for the next tick'''
+        self.ai_game = ai_game
+        self.queue_size = queue_size
+        # how often the input task polls pygame for events, in seconds
+        self.poll_interval = poll_interval
+        self.queue = None
+
+        # latencies (ns) of the last `window` moves
+        self.latencies = deque(maxlen=window)
+        # polls that found the queue full, and its fullest level
+        self.full_polls = 0
+        self.queue_peak = 0
+        self.running = False
+
+    def run(self):
+        '''Run the game until the window is closed or Q is pressed'''
+        asyncio.run(self._main())
+
+    async def _main(self):
+        '''Start the three tasks, stop them all when the first one ends'''
+        # the queue belongs to the running event loop -> create it in here
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.running = True
+        tasks = [asyncio.create_task(coroutine) for coroutine in
+                 (self._collect_input(), self._simulate(), self._render())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.running = False
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _collect_input(self):
+        '''Poll pygame for events and queue them with their arrival time'''
+        queue = self.queue
+        while self.running:
+            # Take events one at a time while there is room; when the queue is
+            # full they wait in pygame's own queue -> nothing (like a KEYUP) is lost
+            while not queue.full():
+                event = pygame.event.poll()
+                if event.type == pygame.NOEVENT:
+                    break
+                if event.type == pygame.QUIT or (
+                        event.type == pygame.KEYDOWN and event.key == pygame.K_q):
+                    return
+                queue.put_nowait((event, perf_counter_ns()))
+            if queue.full():
+                self.full_polls += 1
+            self.queue_peak = max(self.queue_peak, queue.qsize())
+            await asyncio.sleep(self.poll_interval)
+
+    async def _simulate(self):
+        '''Run one fixed tick every 1 / tick_rate seconds'''
+        ai_game = self.ai_game
+        settings = ai_game.settings
+        loop = asyncio.get_running_loop()
+        tick_seconds = 1 / settings.tick_rate
+        next_tick = loop.time()
+
+        while self.running:
+            # Apply every event that arrived since the last tick
+            profiler = ai_game.profiler
+            if profiler:
+                start = perf_counter_ns()
+            moves = []
+            while not self.queue.empty():
+                event, arrived = self.queue.get_nowait()
+                ai_game._handle_event(event)
+                if event.type in (pygame.KEYDOWN, pygame.KEYUP) and event.key in MOVE_KEYS:
+                    moves.append(arrived)
+            if profiler:
+                # step() laps ship / bullets / aliens itself
+                profiler.lap('events', start)
+
+            ai_game.step(ai_game.input)
+            ai_game.input.clear_actions()
+            if moves:
+                # ship.update() ran inside step() -> the moves have been applied
+                applied = perf_counter_ns()
+                self.latencies.extend(applied - arrived for arrived in moves)
+
+            # Fixed schedule; after a long stall skip ahead instead of racing to catch up
+            next_tick += tick_seconds
+            now = loop.time()
+            if next_tick < now - settings.max_catch_up_ms / 1000:
+                next_tick = now
+            await asyncio.sleep(max(0.0, next_tick - now))
+
+    async def _render(self):
+        '''Draw the screen at up to frame_rate frames per second (0 = uncapped)'''
+        ai_game = self.ai_game
+        loop = asyncio.get_running_loop()
+        frame_rate = ai_game.settings.frame_rate
+        # uncapped still yields once per frame so input and ticks keep running
+        frame_seconds = 1 / frame_rate if frame_rate else 0.0
+        while self.running:
+            start = loop.time()
+            profiler = ai_game.profiler
+            if profiler:
+                draw_start = perf_counter_ns()
+            ai_game._update_screen()
+            if profiler:
+                # a profiler frame = one drawn frame, with the ticks run since the last one
+                profiler.lap('screen', draw_start)
+                profiler.end_frame()
+            ai_game.clock.tick()
+            await asyncio.sleep(max(0.0, frame_seconds - (loop.time() - start)))
+
+    def latency_stats(self):
+        '''Return input latency p50 / p95 / max in ms plus the queue counters'''
+        times = sorted(self.latencies)
+        stats = {'moves': len(times), 'full_polls': self.full_polls, 'queue_peak': self.queue_peak}
+        if times:
+            last = len(times) - 1
+            stats.update(p50_ms=times[round(last * 0.50)] / 1e6,
+                         p95_ms=times[round(last * 0.95)] / 1e6,
+                         max_ms=times[-1] / 1e6)
+        return stats
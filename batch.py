@@ -0,0 +1,150 @@
+'''Batch simulation of many headless games for balance tuning
+
+Runs thousands of episodes across every CPU core, each with its own
+Settings values and a scripted or random pilot, and streams one CSV row
+per finished episode:
+    python batch.py --episodes 5000 --out sweep.csv
+
+The settings of episode i only depend on --seed and i, so running the
+same command again skips episodes already in the output file and carries
+on where an interrupted sweep stopped.
+'''
+import argparse
+import csv
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from game_input import TickInput
+
+# Settings that get varied: name -> (low, high), ints are sampled as ints
+SETTING_RANGES = {
+    'speedup_scale': (1.1, 2.0),
+    'score_scale': (1.1, 2.0),
+    'alien_speed': (0.5, 3.0),
+    'bullet_speed': (1.0, 6.0),
+    'bullets_allowed': (3, 100),
+    'fleet_drop_speed': (5, 30),
+}
+
+COLUMNS = (['episode', 'pilot'] + list(SETTING_RANGES)
+           + ['level', 'score', 'survival_ticks', 'game_over'])
+
+def episode_settings(seed, episode):
+    '''Return the settings vector of an episode, always the same for (seed, episode)'''
+    rng = random.Random(f'{seed}-{episode}')
+    values = {}
+    for name, (low, high) in SETTING_RANGES.items():
+        if isinstance(low, int):
+            values[name] = rng.randint(low, high)
+        else:
+            values[name] = round(rng.uniform(low, high), 3)
+    return values
+
+def sweep_pilot(tick, rng):
+    '''Sweep side to side, firing every few ticks'''
+    right = (tick // 90) % 2 == 0
+    return TickInput(left=not right, right=right, fire=tick % 6 == 0)
+
+def random_pilot(tick, rng):
+    '''Pick random keys every tick'''
+    move = rng.random()
+    return TickInput(left=move < 0.35, right=move > 0.65, fire=rng.random() < 0.2)
+
+PILOTS = {'sweep': sweep_pilot, 'random': random_pilot}
+
+# One game class per worker process, imported once by _init_worker
+_game_class = None
+
+def _init_worker():
+    '''Load pygame and every image once per worker, not once per episode'''
+    global _game_class
+    from main import AlienInvasion
+    _game_class = AlienInvasion
+    # building one game fills the worker's shared asset registry
+    AlienInvasion(headless=True)
+
+def run_episode(episode, values, pilot_name, screen_size, max_ticks, seed):
+    '''Play one headless game to game over (or max_ticks), return its result row'''
+    if _game_class is None:
+        _init_worker()
+    game = _game_class(headless=True, screen_size=screen_size)
+    settings = game.settings
+
+    # Level 1 speeds go into the level_one record, the rest are plain settings
+    # -> play below builds the difficulty table from them
+    for name, value in values.items():
+        if name in settings.level_one._fields:
+            settings.level_one = settings.level_one._replace(**{name: value})
+        else:
+            setattr(settings, name, value)
+    game.step(TickInput(play=True))
+
+    pilot = PILOTS[pilot_name]
+    rng = random.Random(f'{seed}-{episode}-pilot')
+    tick = 0
+    while game.game_active and tick < max_ticks:
+        game.step(pilot(tick, rng))
+        tick += 1
+
+    row = {'episode': episode, 'pilot': pilot_name}
+    row.update(values)
+    row.update(level=game.stats.level, score=game.stats.score,
+               survival_ticks=tick, game_over=not game.game_active)
+    return row
+
+def finished_episodes(path):
+    '''Return the episode numbers already written to path'''
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline='') as results:
+        return {int(row['episode']) for row in csv.DictReader(results)}
+
+def run_sweep(episodes, out, pilot='sweep', workers=None, screen_size=(1200, 800),
+              max_ticks=20000, seed=0):
+    '''Run every episode not yet in out across a process pool, appending rows as they finish'''
+    done = finished_episodes(out)
+    todo = [episode for episode in range(episodes) if episode not in done]
+    if not todo:
+        return 0
+
+    write_header = not os.path.exists(out) or os.path.getsize(out) == 0
+    with open(out, 'a', newline='') as results, \
+            ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                initializer=_init_worker) as pool:
+        writer = csv.DictWriter(results, fieldnames=COLUMNS)
+        if write_header:
+            writer.writeheader()
+
+        futures = [pool.submit(run_episode, episode, episode_settings(seed, episode),
+                               pilot, screen_size, max_ticks, seed)
+                   for episode in todo]
+        for future in as_completed(futures):
+            writer.writerow(future.result())
+            # flush each row -> an interrupted sweep keeps everything finished so far
+            results.flush()
+    return len(todo)
+
+def main():
+    '''Read the command line and run the sweep'''
+    parser = argparse.ArgumentParser(description='Alien Invasion batch simulation')
+    parser.add_argument('--episodes', type=int, default=1000, help='episodes in the sweep')
+    parser.add_argument('--out', default='sweep.csv', help='CSV file results are appended to')
+    parser.add_argument('--pilot', choices=list(PILOTS), default='sweep')
+    parser.add_argument('--workers', type=int, help='worker processes (default: every core)')
+    parser.add_argument('--screen', type=int, nargs=2, default=(1200, 800),
+                        metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--max-ticks', type=int, default=20000,
+                        help='stop an episode after this many ticks')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the settings sweep')
+    args = parser.parse_args()
+
+    ran = run_sweep(args.episodes, args.out, args.pilot, args.workers,
+                    tuple(args.screen), args.max_ticks, args.seed)
+    print(f'{ran} episodes run, results in {args.out}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+from itertools import chain, repeat
+from time import perf_counter_ns
+
+import pygame # type: ignore
+
+from assets import COLORKEY, assets
+
+class BatchRenderer:
+    '''Draw a whole frame with one fill and one Surface.blits call
+
+    The alien and ship images are packed side by side into one atlas
+    surface when the renderer is made, the bullet and Play button into a
+    second, opaque one (no per-pixel alpha -> plain copies, no blending).
+    With settings.rle_sprites the sprite atlas is an RLE colorkey surface
+    too, like the sprites themselves, instead of a per-pixel alpha one.
+    A frame is then one list of (atlas, position, area) commands - plus
+    the scoreboard images, which change with the score - handed to a
+    single blits() call, instead of a draw.rect per bullet and a blit per
+    sprite.
+    '''
+
+    def __init__(self, ai_game):
+        '''Build the atlas from the game's sprites'''
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.atlas, self.solid, self.areas = self._build_atlases()
+
+        # Statistics of the last frame
+        self.frames = 0
+        self.draw_calls = 0
+        self.blit_items = 0
+        self.blitted_area = 0
+        # ns spent putting the command list together / inside fill + blits
+        self.build_ns = 0
+        self.draw_ns = 0
+        self.total_build_ns = 0
+        self.total_draw_ns = 0
+
+    def draw(self):
+        '''Draw the frame onto the screen (no flip)'''
+        start = perf_counter_ns()
+        ai_game = self.ai_game
+        atlas = self.atlas
+        solid = self.solid
+        areas = self.areas
+        sb = ai_game.sb
+
+        # same order as the one-call-per-sprite drawing -> identical pixels
+        bullets = ai_game.bullets
+        bullet_rects = [bullet.rect for bullet in bullets]
+        alien_positions = ai_game.aliens.positions()
+        commands = [
+            zip(repeat(solid), bullet_rects, repeat(areas['bullet'])),
+            ((atlas, ai_game.ship.rect, areas['ship']),),
+            zip(repeat(atlas), alien_positions, repeat(areas['alien'])),
+            ((sb.score_image, sb.score_rect), (sb.high_score_image, sb.high_score_rect),
+             (sb.level_image, sb.level_rect)),
+            zip(repeat(sb.ship_image), sb.ship_rects),
+        ]
+        items = len(bullet_rects) + 1 + len(alien_positions) + 3 + len(sb.ship_rects)
+        if not ai_game.game_active:
+            commands.append(((solid, ai_game.play_button.rect, areas['button']),))
+            items += 1
+        built = perf_counter_ns()
+
+        if ai_game.background is None:
+            self.screen.fill(self.settings.bg_color)
+        else:
+            self.screen.blit(ai_game.background, (0, 0))
+        rects = self.screen.blits(chain.from_iterable(commands))
+        done = perf_counter_ns()
+
+        self.frames += 1
+        self.draw_calls = 2
+        self.blit_items = items
+        self.blitted_area = sum(rect.width * rect.height for rect in rects)
+        self.build_ns = built - start
+        self.draw_ns = done - built
+        self.total_build_ns += self.build_ns
+        self.total_draw_ns += self.draw_ns
+
+    def stats(self):
+        '''Return the last frame's draw calls, items and area, plus average times in ms'''
+        frames = self.frames or 1
+        return {
+            'frames': self.frames,
+            'draw_calls': self.draw_calls,
+            'blit_items': self.blit_items,
+            'blitted_area': self.blitted_area,
+            'average_build_ms': self.total_build_ns / frames / 1e6,
+            'average_draw_ms': self.total_draw_ns / frames / 1e6,
+        }
+
+    def _build_atlases(self):
+        '''Pack the fixed images into an alpha and an opaque atlas, return (atlas, solid, {name: area})'''
+        ai_game = self.ai_game
+        settings = self.settings
+
+        bullet = pygame.Surface((settings.bullet_width, settings.bullet_height))
+        bullet.fill(settings.bullet_color)
+
+        # the button with its text baked in -> one blit instead of a fill and a blit
+        button = ai_game.play_button
+        button_image = pygame.Surface(button.rect.size)
+        button_image.fill(button.button_color)
+        button_image.blit(button.msg_image, button.msg_image_rect.move(-button.rect.x, -button.rect.y))
+
+        areas = {}
+        sprites = {'alien': ai_game.aliens.image, 'ship': ai_game.ship.image}
+        solid = assets.to_display(self._pack({'bullet': bullet, 'button': button_image}, 0, areas))
+        if all(image.get_colorkey() is not None for image in sprites.values()):
+            # RLE colorkey sprites (settings.rle_sprites) -> keep the atlas opaque and RLE too,
+            # an alpha atlas would blend every pixel again
+            atlas = assets.to_display(self._pack(sprites, 0, areas, fill=COLORKEY))
+            atlas.set_colorkey(COLORKEY, pygame.RLEACCEL)
+            return atlas, solid, areas
+        # per-pixel alpha keeps the sprites' transparent edges
+        atlas = self._pack(sprites, pygame.SRCALPHA, areas)
+        return assets.to_display(atlas, alpha=True), solid, areas
+
+    @staticmethod
+    def _pack(images, flags, areas, fill=None):
+        '''Blit images side by side onto a new surface, add their areas to areas'''
+        width = sum(image.get_width() for image in images.values())
+        height = max(image.get_height() for image in images.values())
+        packed = pygame.Surface((width, height), flags)
+        if fill is not None:
+            # colorkeyed pixels aren't copied -> they stay the fill color
+            packed.fill(fill)
+        x = 0
+        for name, image in images.items():
+            packed.blit(image, (x, 0))
+            areas[name] = pygame.Rect((x, 0), image.get_size())
+            x += image.get_width()
+        return packed
@@ -0,0 +1,289 @@
+'''Headless stress benchmarks for Alien Invasion
+
+Run `python benchmark.py` for every scenario, or name some of them:
+    python benchmark.py sustained_fire ship_hit_rebuilds --ticks 2000 --out results.json
+
+Each scenario builds a headless AlienInvasion (SDL dummy video driver),
+runs a fixed number of ticks with a draw after each one, and reports
+ticks/sec. A second, traced run reports peak and retained memory.
+
+`python benchmark.py --entities 10000` instead compares the bytes per
+entity and update() time of the Sprite-based Bullet / Alien classes with
+the slotted SlimBullet / SlimAlien ones, and `--render` compares drawing
+a crowded 4K frame one call per sprite with the batched renderer.
+`--check` makes sure bullets still hit at levels where they cross the
+whole screen in one tick, and that the game survives a moving ship at
+Settings.max_level; it exits with an error if not.
+'''
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame # type: ignore
+
+from main import AlienInvasion
+from game_input import TickInput
+from bullet import Bullet
+from alien import Alien
+from entities import SlimBullet, SlimAlien
+from dirty_rects import DirtyRectRenderer
+
+FIRE = TickInput(fire=True)
+SWEEP_RIGHT = TickInput(right=True, fire=True)
+SWEEP_LEFT = TickInput(left=True, fire=True)
+
+# Speed-ups stop here, 1.5 ** 40 is already far beyond playable
+MAX_LEVEL = 40
+
+def max_density_4k(game, tick):
+    '''Full 4K fleet, ship sweeps side to side while firing'''
+    game.step(SWEEP_RIGHT if (tick // 120) % 2 == 0 else SWEEP_LEFT)
+
+def sustained_fire(game, tick):
+    '''Fire every tick so the screen stays at bullets_allowed'''
+    # ship never dies -> the bullet count stays at the limit
+    game.stats.ships_left = game.settings.ship_limit
+    game.step(FIRE)
+
+def rapid_level_ups(game, tick):
+    '''Wipe the fleet every 10 ticks -> new wave + increase_speed'''
+    if tick % 10 == 0 and game.stats.level < MAX_LEVEL:
+        game.aliens.kill(game.aliens.alive.nonzero()[0].tolist())
+    game.stats.ships_left = game.settings.ship_limit
+    game.pause_ticks = 0
+    game.step(FIRE)
+
+def ship_hit_rebuilds(game, tick):
+    '''Hit the ship every tick -> empty and rebuild the fleet each time'''
+    game.stats.ships_left = game.settings.ship_limit
+    game._ship_hit()
+    game.pause_ticks = 0
+    game.step(FIRE)
+
+def late_game(game, tick):
+    '''Jump straight to MAX_LEVEL -> fastest bullets and aliens, swept collisions'''
+    if tick == 0:
+        game.jump_to_level(MAX_LEVEL)
+    game.stats.ships_left = game.settings.ship_limit
+    game.step(SWEEP_RIGHT if (tick // 120) % 2 == 0 else SWEEP_LEFT)
+
+# name: (screen size, tick function)
+SCENARIOS = {
+    'max_density_4k': ((3840, 2160), max_density_4k),
+    'sustained_fire': ((1200, 800), sustained_fire),
+    'rapid_level_ups': ((1200, 800), rapid_level_ups),
+    'ship_hit_rebuilds': ((1920, 1080), ship_hit_rebuilds),
+    'late_game': ((1200, 800), late_game),
+}
+
+def run_ticks(screen_size, tick_function, ticks, dirty_rects=False):
+    '''Play ticks ticks of a fresh headless game, drawing after each, return the game'''
+    game = AlienInvasion(headless=True, screen_size=screen_size)
+    if dirty_rects:
+        game.settings.dirty_rect_rendering = True
+        game.dirty_renderer = DirtyRectRenderer(game)
+    game.step(TickInput(play=True))
+    for tick in range(ticks):
+        tick_function(game, tick)
+        game._update_screen()
+    return game
+
+def run_scenario(name, ticks, dirty_rects=False):
+    '''Time one scenario, then run it again under tracemalloc, return its results'''
+    screen_size, tick_function = SCENARIOS[name]
+
+    start = time.perf_counter()
+    game = run_ticks(screen_size, tick_function, ticks, dirty_rects)
+    seconds = time.perf_counter() - start
+
+    # tracing slows everything down -> memory comes from a separate run
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    run_ticks(screen_size, tick_function, ticks, dirty_rects)
+    current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks_after = sys.getallocatedblocks()
+
+    return {
+        'screen_size': list(screen_size),
+        'ticks': ticks,
+        'seconds': round(seconds, 4),
+        'ticks_per_sec': round(ticks / seconds, 1),
+        'peak_bytes': peak_bytes,
+        'retained_bytes': current_bytes,
+        # memory blocks still held after the run (not the number of allocations made)
+        'retained_blocks': blocks_after - blocks_before,
+        'final_level': game.stats.level,
+        'final_score': game.stats.score,
+        # share of the screen pushed per frame, with --dirty-rects
+        'dirty_rects': game.dirty_renderer.stats() if game.dirty_renderer else None,
+    }
+
+def check_fast_bullets(levels=(16, 20, MAX_LEVEL), ticks=60):
+    '''Fire straight up for ticks ticks at each level, return {level: score}
+
+    From about level 15 a bullet moves more than a screen height per tick,
+    so it leaves the screen in the same tick it passes the fleet. Only the
+    swept collision test can score there -> a 0 means bullets tunnel.
+    '''
+    scores = {}
+    for level in levels:
+        game = AlienInvasion(headless=True)
+        game.step(TickInput(play=True))
+        game.jump_to_level(level)
+        for _ in range(ticks):
+            game.stats.ships_left = game.settings.ship_limit
+            game.step(FIRE)
+        scores[level] = game.stats.score
+    return scores
+
+def check_max_level(ticks=240):
+    '''Sweep the ship side to side while firing at Settings.max_level, return the result
+
+    Ships and aliens there move far more than a screen per tick; the game
+    must keep every position in range (an exception means it didn't).
+    '''
+    game = AlienInvasion(headless=True)
+    game.step(TickInput(play=True))
+    game.jump_to_level(game.settings.max_level)
+    for tick in range(ticks):
+        game.stats.ships_left = game.settings.ship_limit
+        game.pause_ticks = 0
+        game.step(SWEEP_RIGHT if (tick // 20) % 2 == 0 else SWEEP_LEFT)
+    ship = game.ship.rect
+    return {'level': game.stats.level, 'score': game.stats.score,
+            'ship_on_screen': game.screen.get_rect().contains(ship)}
+
+def measure_entities(factory, count):
+    '''Return (bytes per entity, update() ns per entity) for count entities from factory'''
+    # the list is made first -> only the entities themselves are traced
+    entities = [None] * count
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for index in range(count):
+        entities[index] = factory()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # best of a few passes -> less noise from the rest of the system
+    best = None
+    for _ in range(5):
+        start = time.perf_counter_ns()
+        for entity in entities:
+            entity.update()
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return (after - before) / count, best / count
+
+def entity_memory(count):
+    '''Compare Sprite-based and slotted bullets / aliens, return the results'''
+    game = AlienInvasion(headless=True)
+    slim_bullet = SlimBullet.bind(game)
+    slim_alien = SlimAlien.bind(game)
+    pairs = {
+        'bullet': (lambda: Bullet(game), slim_bullet),
+        'alien': (lambda: Alien(game), slim_alien),
+    }
+    results = {'count': count}
+    for name, (sprite_factory, slim_factory) in pairs.items():
+        sprite_bytes, sprite_ns = measure_entities(sprite_factory, count)
+        slim_bytes, slim_ns = measure_entities(slim_factory, count)
+        results[name] = {
+            'sprite_bytes': round(sprite_bytes, 1),
+            'slim_bytes': round(slim_bytes, 1),
+            'saved_percent': round(100 * (1 - slim_bytes / sprite_bytes), 1),
+            'sprite_update_ns': round(sprite_ns, 1),
+            'slim_update_ns': round(slim_ns, 1),
+        }
+    return results
+
+def render_comparison(ticks, bullets_allowed=1000):
+    '''Time one-call-per-sprite drawing against BatchRenderer on a crowded 4K game'''
+    game = AlienInvasion(headless=True, screen_size=(3840, 2160))
+    game.settings.bullets_allowed = bullets_allowed
+    game.step(TickInput(play=True))
+    batch_renderer = game.batch_renderer
+    per_sprite_ns = batched_ns = 0
+    for tick in range(ticks):
+        max_density_4k(game, tick)
+        game.batch_renderer = None
+        start = time.perf_counter_ns()
+        game._update_screen()
+        per_sprite_ns += time.perf_counter_ns() - start
+        game.batch_renderer = batch_renderer
+        start = time.perf_counter_ns()
+        game._update_screen()
+        batched_ns += time.perf_counter_ns() - start
+
+    # fill + a draw.rect per bullet + ship + aliens blits + 3 texts + ship icons blits
+    per_sprite_calls = 1 + len(game.bullets) + 1 + 1 + 3 + 1
+    return {
+        'ticks': ticks,
+        'bullets': len(game.bullets),
+        'aliens': len(game.aliens),
+        'per_sprite_ms': round(per_sprite_ns / ticks / 1e6, 3),
+        'per_sprite_draw_calls': per_sprite_calls,
+        'batched_ms': round(batched_ns / ticks / 1e6, 3),
+        'batched': batch_renderer.stats(),
+    }
+
+def main():
+    '''Run the chosen scenarios and print / save the results as JSON'''
+    parser = argparse.ArgumentParser(description='Alien Invasion benchmarks')
+    parser.add_argument('scenarios', nargs='*',
+                        help=f"scenarios to run (default: all): {', '.join(SCENARIOS)}")
+    parser.add_argument('--ticks', type=int, default=1000,
+                        help='ticks per scenario (default: 1000)')
+    parser.add_argument('--out', metavar='PATH', help='also write the results to PATH')
+    parser.add_argument('--render', action='store_true',
+                        help='compare per-sprite and batched drawing of a crowded 4K frame')
+    parser.add_argument('--entities', type=int, metavar='N',
+                        help='compare per-entity memory of N Sprite vs slotted entities instead')
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help='draw the scenarios with dirty rects and report the pixels pushed per frame')
+    parser.add_argument('--check', action='store_true',
+                        help='check that bullets still hit at levels where they cross the screen in one tick')
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'scenarios': {},
+    }
+    if args.entities:
+        results['entity_memory'] = entity_memory(args.entities)
+    if args.render:
+        results['render'] = render_comparison(args.ticks)
+    if args.check:
+        results['fast_bullets'] = check_fast_bullets()
+        results['max_level'] = check_max_level()
+    # --entities / --render / --check alone -> no scenarios unless some are named
+    scenarios = args.scenarios or ([] if args.entities or args.render or args.check else SCENARIOS)
+    for name in scenarios:
+        results['scenarios'][name] = run_scenario(name, args.ticks, args.dirty_rects)
+        print(f"{name:<20} {results['scenarios'][name]['ticks_per_sec']:>10} ticks/sec",
+              file=sys.stderr)
+
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.out:
+        with open(args.out, 'w') as out:
+            out.write(report)
+    if args.check and not all(results['fast_bullets'].values()):
+        sys.exit('fast bullets scored nothing at some level -> they tunnel through the fleet')
+    if args.check and not results['max_level']['ship_on_screen']:
+        sys.exit(f"the ship left the screen at level {results['max_level']['level']}")
+
+if __name__ == '__main__':
+    main()
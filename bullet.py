@@ -29,7 +29,7 @@ class Bullet(Sprite):
     def update(self):
         '''Move the bullet up the screen = decreasing y coord of the bullet'''
         # Update the exact position of the bullet
-        self.y -= self.settings.bullet_speed
+        self.y -= self.settings.difficulty.bullet_speed
         # Update the rect position
         self.rect.y = self.y
     
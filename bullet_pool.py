@@ -0,0 +1,90 @@
+from itertools import islice
+
+from entities import SlimBullet
+
+class BulletPool:
+    '''A fixed-size pool of bullets that are reused instead of created per shot
+
+    All bullets are made up front. The first `active` entries of the pool
+    are in flight; firing moves the next idle bullet into that range and
+    expired bullets are swapped back out in place, so shooting creates no
+    new objects and nothing has to be copied to remove a bullet.
+    '''
+
+    def __init__(self, ai_game):
+        '''Create one bullet for every bullet allowed on screen'''
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        # slotted bullets sharing screen / settings / color through their class
+        self.bullet_class = SlimBullet.bind(ai_game)
+        self._bullets = [self.bullet_class() for _ in range(self.settings.bullets_allowed)]
+        # number of bullets in flight = first `active` entries of _bullets
+        self.active = 0
+        # pixels every bullet moved up in the last update() -> swept collisions
+        self.travel = 0.0
+
+        # Statistics
+        self.allocations = len(self._bullets)
+        self.shots = 0
+        self.peak_active = 0
+
+    def __len__(self):
+        '''Number of bullets in flight'''
+        return self.active
+
+    def __iter__(self):
+        '''Iterate over bullets in flight, oldest first'''
+        return islice(self._bullets, self.active)
+
+    def sprites(self):
+        '''Return a list of bullets in flight, like Group.sprites()'''
+        return self._bullets[:self.active]
+
+    def fire(self, midtop):
+        '''Put an idle bullet in flight at midtop, return it'''
+        if self.active == len(self._bullets):
+            # bullets_allowed was raised after the pool was made -> grow once
+            self._bullets.append(self.bullet_class())
+            self.allocations += 1
+        bullet = self._bullets[self.active]
+        bullet.reset(midtop)
+        self.active += 1
+        self.shots += 1
+        self.peak_active = max(self.peak_active, self.active)
+        return bullet
+
+    def update(self, scale=1.0):
+        '''Move every bullet in flight, scale = tick length in reference ticks'''
+        # same distance for every bullet -> read the level's speed once, not per bullet
+        # no bullet can travel further than the whole screen in one tick; late levels
+        # are faster than that and would push a Rect past its integer range
+        self.travel = travel = min(self.settings.difficulty.bullet_speed * scale,
+                                   self.settings.screen_height + self.settings.bullet_height)
+        for bullet in islice(self._bullets, self.active):
+            bullet.move(travel)
+
+    def remove_expired(self):
+        '''Send bullets that left the top of the screen back to the pool'''
+        bullets = self._bullets
+        kept = 0
+        for index in range(self.active):
+            bullet = bullets[index]
+            if bullet.rect.bottom > 0:
+                # keep firing order -> collisions still credit the oldest bullet first
+                bullets[kept], bullets[index] = bullet, bullets[kept]
+                kept += 1
+        self.active = kept
+
+    def empty(self):
+        '''Send every bullet back to the pool'''
+        self.active = 0
+
+    def stats(self):
+        '''Return pool occupancy and allocation counts as a dictionary'''
+        return {
+            'capacity': len(self._bullets),
+            'active': self.active,
+            'peak_active': self.peak_active,
+            'allocations': self.allocations,
+            'shots': self.shots,
+        }
@@ -1,4 +1,6 @@
-import pygame.font # type: ignore
+import pygame # type: ignore
+
+from assets import assets
 
 class Button:
     '''A class to build buttons for the game'''
@@ -13,8 +15,8 @@ class Button:
         self.button_color = (0,135,0)
         self.text_color = (255,255,255)
         # pygame render text to screen
-        # None -> use default font, 48 = size of text
-        self.font = pygame.font.SysFont(None, 48)
+        # None -> use default font, 48 = size of text (shared with the scoreboard)
+        self.font = assets.font(None, 48)
 
         # Build the button's rect object and center it
         self.rect = pygame.Rect(0,0, self.width, self.height)
@@ -26,7 +28,10 @@ class Button:
     def _prep_msg(self, msg):
         '''Turn msg into a rendered image and center text on the button'''
         # font.render() turns text stored in msg into an image -> store in self.msg_image
-        self.msg_image = self.font.render(msg, True, self.text_color, self.button_color)
+        # to_display() -> same pixel format as the screen, so draw_button() blits without converting
+        self.msg_image = assets.to_display(
+            self.font.render(msg, True, self.text_color, self.button_color)
+        )
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
         
@@ -0,0 +1,177 @@
+import json
+import os
+import queue
+import struct
+import threading
+import zlib
+
+import pygame # type: ignore
+
+FORMATS = ('png', 'raw')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def encode_png(surface, level=6):
+    '''Return surface as PNG file bytes
+
+    pygame.image.save() holds the GIL for the whole encode (~50 ms for a
+    1200x800 frame), which would stall the game thread; zlib.compress()
+    releases it, so frames are encoded here instead.
+    '''
+    width, height = surface.get_size()
+    pixels = pygame.image.tobytes(surface, 'RGB')
+    stride = width * 3
+    # each row starts with its filter type, 0 = none
+    rows = b''.join(b'\x00' + pixels[row:row + stride] for row in range(0, stride * height, stride))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0) # 8-bit RGB
+    return b''.join((PNG_SIGNATURE, _png_chunk(b'IHDR', header),
+                     _png_chunk(b'IDAT', zlib.compress(rows, level)), _png_chunk(b'IEND', b'')))
+
+def _png_chunk(kind, data):
+    '''Return one PNG chunk: length, type, data, CRC'''
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+class FrameCapture:
+    '''A class to save drawn frames to disk without slowing the game down
+
+    capture() copies the screen into the next free surface of a ring that
+    is allocated once, and a writer thread encodes it (PNG files or one
+    raw RGB stream) and hands the surface back. When every surface is
+    still waiting to be written the frame is dropped, so the game never
+    waits on the disk - unless wait=True, for offline replays where every
+    frame matters. If writing fails (disk full, folder gone ...) the writer
+    stops, the error shows up in stats() and later frames are dropped.
+    '''
+
+    def __init__(self, ai_game, out_dir, fmt='png', slots=32, every=1, wait=False):
+        '''Prepare slots frame surfaces and start the writer, fmt = 'png' or 'raw' '''
+        if fmt not in FORMATS:
+            raise ValueError(f'unknown capture format: {fmt}')
+        if every < 1:
+            raise ValueError(f'every must be at least 1, got {every}')
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.out_dir = out_dir
+        self.format = fmt
+        # capture every `every`-th frame drawn
+        self.every = every
+        self.wait = wait
+        os.makedirs(out_dir, exist_ok=True)
+
+        # Ring of frame surfaces, same size and pixel format as the screen
+        self._slots = [self.screen.copy() for _ in range(slots)]
+        self._free = queue.SimpleQueue()
+        for index in range(slots):
+            self._free.put(index)
+        # (slot index, frame number, tick) waiting for the writer, None = stop
+        self._filled = queue.SimpleQueue()
+
+        # Statistics
+        self.frames = 0
+        self.captured = 0
+        self.dropped = 0
+        self.written = 0
+        self.backlog_peak = 0
+        # tick of every frame written, in order -> saved to frames.json
+        self.ticks = []
+        # first write error, None while everything is fine
+        self.error = None
+        self._closed = False
+
+        self._raw = open(os.path.join(out_dir, 'frames.raw'), 'wb') if fmt == 'raw' else None
+        self._writer = threading.Thread(target=self._write_loop, name='frame-writer', daemon=True)
+        self._writer.start()
+
+    def capture(self):
+        '''Copy the screen into a free slot and queue it for the writer'''
+        self.frames += 1
+        if (self.frames - 1) % self.every:
+            return
+        index = self._free_slot()
+        if index is None:
+            # writer is behind (or has stopped) and every slot is taken -> skip this frame
+            self.dropped += 1
+            return
+        self._slots[index].blit(self.screen, (0, 0))
+        self._filled.put((index, self.captured, self.ai_game.ticks))
+        self.captured += 1
+        self.backlog_peak = max(self.backlog_peak, self.backlog)
+
+    def _free_slot(self):
+        '''Return the index of a free slot, or None if there is none to be had'''
+        if self.error is not None:
+            # the writer has stopped -> nothing will be written any more
+            return None
+        if not self.wait:
+            try:
+                return self._free.get_nowait()
+            except queue.Empty:
+                return None
+        # wait for the writer, but not on a writer that has died
+        while True:
+            try:
+                return self._free.get(timeout=0.1)
+            except queue.Empty:
+                if not self._writer.is_alive():
+                    return None
+
+    @property
+    def backlog(self):
+        '''Frames copied but not written yet'''
+        return self.captured - self.written
+
+    def close(self):
+        '''Write every queued frame, stop the writer and save the frame index'''
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer.is_alive():
+            self._filled.put(None)
+            self._writer.join()
+        try:
+            if self._raw:
+                self._raw.close()
+            # frame i (frame_i.png or the i-th frame of frames.raw) was drawn at ticks[i]
+            # -> written even after an error, for the frames that did make it
+            width, height = self.screen.get_size()
+            with open(os.path.join(self.out_dir, 'frames.json'), 'w') as info:
+                json.dump({'format': self.format, 'width': width, 'height': height,
+                           'pixel_format': 'RGB', 'ticks': self.ticks}, info)
+        except OSError as error:
+            self.error = self.error or f'{type(error).__name__}: {error}'
+
+    def stats(self):
+        '''Return the capture counters as a dictionary'''
+        return {
+            'frames': self.frames,
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'written': self.written,
+            'backlog': self.backlog,
+            'backlog_peak': self.backlog_peak,
+            'slots': len(self._slots),
+            'error': self.error,
+        }
+
+    def _write_loop(self):
+        '''Writer thread: encode queued frames until close()'''
+        while True:
+            item = self._filled.get()
+            if item is None:
+                return
+            index, number, tick = item
+            surface = self._slots[index]
+            try:
+                if self._raw:
+                    self._raw.write(pygame.image.tobytes(surface, 'RGB'))
+                else:
+                    with open(os.path.join(self.out_dir, f'frame_{number:06d}.png'), 'wb') as frame:
+                        frame.write(encode_png(surface))
+            except (OSError, pygame.error) as error:
+                # disk full, folder removed ... -> stop; capture() drops frames from now on
+                self.error = f'{type(error).__name__}: {error}'
+                self._free.put(index)
+                return
+            self.ticks.append(tick)
+            self.written += 1
+            self._free.put(index)
@@ -0,0 +1,25 @@
+from collections import namedtuple
+from functools import lru_cache
+
+# Everything that changes from one level to the next, frozen per level
+Difficulty = namedtuple('Difficulty', 'level ship_speed bullet_speed alien_speed alien_points')
+
+@lru_cache(maxsize=16)
+def difficulty_table(level_one, speedup_scale, score_scale, max_level):
+    '''Return a tuple with the Difficulty of levels 1 .. max_level, computed only once
+
+    Level n + 1 is level n sped up by speedup_scale with points scaled by
+    score_scale - the same steps Settings.increase_speed() took every
+    level - so moving to any level is just an index into the table.
+    '''
+    levels = [level_one]
+    while len(levels) < max_level:
+        last = levels[-1]
+        levels.append(Difficulty(
+            level=last.level + 1,
+            ship_speed=last.ship_speed * speedup_scale,
+            bullet_speed=last.bullet_speed * speedup_scale,
+            alien_speed=last.alien_speed * speedup_scale,
+            alien_points=int(last.alien_points * score_scale),
+        ))
+    return tuple(levels)
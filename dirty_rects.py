@@ -0,0 +1,133 @@
+import pygame # type: ignore
+
+class DirtyRectRenderer:
+    '''Draw the game but only push the parts of the screen that changed
+
+    Each frame is described as a list of (source, rect) items, where source
+    is either a surface to blit or a color to fill. Only the rects of items
+    that appeared or vanished since the last frame are cleared, redrawn and
+    sent to the display with pygame.display.update(rects).
+
+    On a scaled playfield (ai_game.display_view) the whole view is scaled
+    and flipped instead, so every pixel counts as pushed there.
+    '''
+
+    def __init__(self, ai_game):
+        '''Keep references to the game objects that get drawn'''
+        self.ai_game = ai_game
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+        # Items drawn on the previous frame: {key: rect}
+        self.previous = {}
+        # Sources of the previous frame kept alive -> their id() can't be reused by new surfaces
+        self.previous_sources = []
+        # First frame has to cover the whole screen
+        self.full_redraw = True
+        # Rects redrawn this frame, pushed by present()
+        self.dirty = []
+
+        # Statistics
+        self.frames = 0
+        self.pixels_pushed = 0 # on the last frame
+        self.total_pixels_pushed = 0
+
+    def draw(self):
+        '''Redraw the changed parts of the screen (present() pushes them)'''
+        items = self._frame_items()
+        # copy rects -> sprites move their own rect objects before the next frame
+        current = {self._key(source, rect): pygame.Rect(rect) for source, rect in items}
+
+        if self.full_redraw:
+            dirty = [self.screen.get_rect()]
+            self.full_redraw = False
+        else:
+            # rects of items that moved, changed image or disappeared / appeared
+            removed = [rect for key, rect in self.previous.items() if key not in current]
+            added = [rect for key, rect in current.items() if key not in self.previous]
+            dirty = removed + added
+
+        # Clear each dirty rect and redraw only what falls inside it
+        # clipping -> every pixel is drawn exactly once (images with alpha would darken otherwise)
+        item_rects = [rect for source, rect in items]
+        for dirty_rect in dirty:
+            # fill() respects the clip too -> set it first
+            self.screen.set_clip(dirty_rect)
+            self.screen.fill(self.settings.bg_color)
+            for index in dirty_rect.collidelistall(item_rects):
+                source, rect = items[index]
+                if isinstance(source, tuple):
+                    # draw.rect rather than fill -> fill() mis-clips rects hanging off the top edge
+                    pygame.draw.rect(self.screen, source, rect)
+                else:
+                    self.screen.blit(source, rect)
+        self.screen.set_clip(None)
+
+        self.dirty = dirty
+        self.previous = current
+        self.previous_sources = [source for source, rect in items]
+
+        if dirty and self.ai_game.display_view is not None:
+            # present() scales the whole playfield onto the display
+            self.pixels_pushed = self.screen.get_width() * self.screen.get_height()
+        else:
+            self.pixels_pushed = sum(rect.width * rect.height for rect in dirty)
+        self.total_pixels_pushed += self.pixels_pushed
+        self.frames += 1
+
+    def present(self, extra=()):
+        '''Push this frame's dirty rects and extra (e.g. the overlay) to the display, once'''
+        rects = self.dirty + list(extra)
+        if not rects or self.ai_game.headless:
+            return
+        if self.ai_game.display_view is None:
+            pygame.display.update(rects)
+        else:
+            # playfield is scaled onto the display -> the whole view is shown again
+            self.ai_game._present()
+
+    def invalidate(self):
+        '''Force the next frame to redraw and push the whole screen'''
+        self.full_redraw = True
+
+    def stats(self):
+        '''Return pushed-pixel statistics as a dictionary'''
+        screen_pixels = self.screen.get_width() * self.screen.get_height()
+        average = self.total_pixels_pushed / self.frames if self.frames else 0
+        return {
+            'frames': self.frames,
+            'pixels_pushed': self.pixels_pushed,
+            'average_pixels_pushed': average,
+            # share of a full flip each frame pushes on average
+            'average_screen_fraction': average / screen_pixels,
+        }
+
+    def _frame_items(self):
+        '''List everything on screen this frame, in drawing order'''
+        ai_game = self.ai_game
+        items = [(bullet.color, bullet.rect) for bullet in ai_game.bullets]
+
+        items.append((ai_game.ship.image, ai_game.ship.rect))
+
+        fleet = ai_game.aliens
+        alien_width, alien_height = fleet.alien_size
+        items.extend((fleet.image, pygame.Rect(x, y, alien_width, alien_height))
+                     for x, y in fleet.positions())
+
+        sb = ai_game.sb
+        items.append((sb.score_image, sb.score_rect))
+        items.append((sb.high_score_image, sb.high_score_rect))
+        items.append((sb.level_image, sb.level_rect))
+        items.extend((sb.ship_image, rect) for rect in sb.ship_rects)
+
+        if not ai_game.game_active:
+            button = ai_game.play_button
+            items.append((button.button_color, button.rect))
+            items.append((button.msg_image, button.msg_image_rect))
+        return items
+
+    @staticmethod
+    def _key(source, rect):
+        '''Identify an item by what is drawn and where'''
+        source_key = source if isinstance(source, tuple) else id(source)
+        return (source_key, tuple(rect))
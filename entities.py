@@ -0,0 +1,149 @@
+import pygame # type: ignore
+
+from assets import assets
+
+class SlotSprite:
+    '''A Sprite stand-in with __slots__ -> no per-instance __dict__
+
+    pygame.sprite.Sprite has no __slots__, so every subclass instance
+    carries a __dict__ and a set of its groups. Groups accept any object
+    with add_internal() / remove_internal(), so this class offers the same
+    interface (add, remove, kill, alive, groups, update) and only creates
+    the group set once the sprite is actually put in a group.
+    '''
+
+    __slots__ = ('_groups',)
+
+    def __init__(self, *groups):
+        '''Create the sprite, optionally in groups'''
+        self._groups = None
+        if groups:
+            self.add(*groups)
+
+    @classmethod
+    def bind(cls, ai_game, **shared):
+        '''Return a subclass whose instances share ai_game's screen and settings
+
+        Shared references live on the class, not on each instance; one
+        subclass per game keeps several games in one process apart.
+        '''
+        shared.update(screen=ai_game.screen, settings=ai_game.settings, __slots__=())
+        return type(cls.__name__, (cls,), shared)
+
+    def add(self, *groups):
+        '''Add the sprite to groups (or sequences of groups)'''
+        for group in groups:
+            if hasattr(group, '_spritegroup'):
+                if not group.has_internal(self):
+                    group.add_internal(self)
+                    self.add_internal(group)
+            else:
+                self.add(*group)
+
+    def remove(self, *groups):
+        '''Remove the sprite from groups (or sequences of groups)'''
+        for group in groups:
+            if hasattr(group, '_spritegroup'):
+                if group.has_internal(self):
+                    group.remove_internal(self)
+                    self.remove_internal(group)
+            else:
+                self.remove(*group)
+
+    def add_internal(self, group):
+        '''Called by a group the sprite is added to'''
+        if self._groups is None:
+            self._groups = set()
+        self._groups.add(group)
+
+    def remove_internal(self, group):
+        '''Called by a group the sprite is removed from'''
+        self._groups.discard(group)
+
+    def kill(self):
+        '''Remove the sprite from every group it is in'''
+        for group in self.groups():
+            group.remove_internal(self)
+        self._groups = None
+
+    def alive(self):
+        '''Return True while the sprite belongs to any group'''
+        return bool(self._groups)
+
+    def groups(self):
+        '''Return a list of the groups the sprite is in'''
+        return list(self._groups) if self._groups else []
+
+    def update(self, *args, **kwargs):
+        '''Do nothing by default, like Sprite.update()'''
+
+class SlimBullet(SlotSprite):
+    '''A bullet with only a rect and y per instance
+
+    Use SlimBullet.bind(ai_game) to get the class to create bullets from;
+    screen, settings and color are shared on that class.
+    '''
+
+    __slots__ = ('rect', 'y')
+
+    @classmethod
+    def bind(cls, ai_game):
+        '''Return the bullet class for ai_game'''
+        return super().bind(ai_game, color=ai_game.settings.bullet_color)
+
+    def __init__(self, midtop=(0, 0)):
+        '''Create a bullet whose top middle is at midtop'''
+        super().__init__()
+        self.rect = pygame.Rect(0, 0, self.settings.bullet_width, self.settings.bullet_height)
+        self.reset(midtop)
+
+    def reset(self, midtop):
+        '''Move a recycled bullet back to the top of the ship'''
+        self.rect.midtop = midtop
+        self.y = float(self.rect.y)
+
+    def update(self, scale=1.0):
+        '''Move the bullet up the screen, scale = tick length in reference ticks'''
+        # same as move(), written out -> one call less per bullet per tick
+        self.y -= self.settings.difficulty.bullet_speed * scale
+        self.rect.y = self.y
+
+    def move(self, distance):
+        '''Move the bullet distance pixels up the screen (BulletPool works out distance once)'''
+        self.y -= distance
+        self.rect.y = self.y
+
+    def draw_bullet(self):
+        '''Draw the bullet to the screen'''
+        pygame.draw.rect(self.screen, self.color, self.rect)
+
+class SlimAlien(SlotSprite):
+    '''An alien with only a rect and x per instance
+
+    Use SlimAlien.bind(ai_game) to get the class to create aliens from;
+    screen, settings and the image are shared on that class.
+    '''
+
+    __slots__ = ('rect', 'x')
+
+    @classmethod
+    def bind(cls, ai_game):
+        '''Return the alien class for ai_game'''
+        return super().bind(ai_game, image=assets.image('images/alien.bmp'))
+
+    def __init__(self):
+        '''Create an alien near the top left of the screen'''
+        super().__init__()
+        self.rect = self.image.get_rect()
+        self.rect.x = self.rect.width
+        self.rect.y = self.rect.height
+        self.x = float(self.rect.x)
+
+    def update(self, scale=1.0):
+        '''Move the alien to the right or left, scale = tick length in reference ticks'''
+        self.x += self.settings.difficulty.alien_speed * self.settings.fleet_direction * scale
+        self.rect.x = self.x
+
+    def check_edges(self):
+        '''Return True if alien is at edge of screen'''
+        return self.rect.right >= self.screen.get_width() or self.rect.left <= 0
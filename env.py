@@ -0,0 +1,180 @@
+'''Reinforcement-learning environments built on the headless game
+
+AlienInvasionEnv follows the Gym reset() / step(action) pattern:
+    env = AlienInvasionEnv()
+    observation = env.reset()
+    observation, reward, terminated, truncated, info = env.step(action)
+
+VectorEnv steps N games in one call. `python env.py --envs 16` reports
+how many steps per second that reaches.
+'''
+import argparse
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np # type: ignore
+import pygame # type: ignore
+
+from main import AlienInvasion
+from game_input import TickInput
+
+# Discrete actions -> input held for that step
+ACTIONS = (
+    TickInput(),                        # 0: do nothing
+    TickInput(left=True),               # 1: move left
+    TickInput(right=True),              # 2: move right
+    TickInput(fire=True),               # 3: fire
+    TickInput(left=True, fire=True),    # 4: move left and fire
+    TickInput(right=True, fire=True),   # 5: move right and fire
+)
+
+class AlienInvasionEnv:
+    '''One headless game wrapped as a reset() / step(action) environment
+
+    observation='state' gives a float32 vector: ship x, fleet offset and
+    direction, bullets in flight, ships left, level, then one alive flag
+    per alien slot. observation='frame' gives the screen downsampled to
+    frame_size as a grayscale uint8 array. The reward is the score gained.
+    '''
+
+    def __init__(self, screen_size=(1200, 800), observation='state',
+                 frame_size=(84, 84), frame_skip=1, max_ticks=None):
+        '''Create the game, observation = 'state' or 'frame' '''
+        if observation not in ('state', 'frame'):
+            raise ValueError(f'unknown observation type: {observation}')
+        self.game = AlienInvasion(headless=True, screen_size=screen_size)
+        self.observation_type = observation
+        self.frame_size = frame_size
+        # each step() repeats the action for frame_skip ticks
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+        self.action_count = len(ACTIONS)
+        self._frame = pygame.Surface(frame_size)
+        self._episode_start = 0
+
+    def reset(self):
+        '''Start a new game and return the first observation'''
+        game = self.game
+        # Play only works on the title screen -> end any game still running
+        game.game_active = False
+        game.step(TickInput(play=True))
+        self._episode_start = game.ticks
+        return self.observe()
+
+    def step(self, action):
+        '''Apply action, return (observation, reward, terminated, truncated, info)'''
+        game = self.game
+        inputs = ACTIONS[action]
+        score = game.stats.score
+        for _ in range(self.frame_skip):
+            game.step(inputs)
+            if not game.game_active:
+                break
+
+        reward = game.stats.score - score
+        terminated = not game.game_active
+        episode_ticks = game.ticks - self._episode_start
+        truncated = bool(self.max_ticks and episode_ticks >= self.max_ticks and not terminated)
+        info = {'score': game.stats.score, 'level': game.stats.level,
+                'ships_left': game.stats.ships_left, 'ticks': episode_ticks}
+        return self.observe(), reward, terminated, truncated, info
+
+    def observe(self):
+        '''Return the current observation'''
+        if self.observation_type == 'frame':
+            return self._observe_frame()
+        return self._observe_state()
+
+    def _observe_state(self):
+        '''Structured state, every value scaled to roughly 0..1'''
+        game = self.game
+        settings = game.settings
+        fleet = game.aliens
+        head = np.array([
+            game.ship.x / settings.screen_width,
+            fleet.grid.offset_x / settings.screen_width,
+            fleet.grid.offset_y / settings.screen_height,
+            settings.fleet_direction,
+            len(game.bullets) / settings.bullets_allowed,
+            game.stats.ships_left / settings.ship_limit,
+            game.stats.level / 10,
+        ], dtype=np.float32)
+        return np.concatenate((head, fleet.alive.astype(np.float32)))
+
+    def _observe_frame(self):
+        '''Draw the screen and shrink it to a grayscale frame_size array'''
+        game = self.game
+        game._update_screen()
+        pygame.transform.smoothscale(game.screen, self.frame_size, self._frame)
+        # (width, height, 3) -> (height, width) luminance
+        pixels = pygame.surfarray.pixels3d(self._frame)
+        gray = pixels @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        del pixels # release the surface lock
+        return gray.T.astype(np.uint8)
+
+class VectorEnv:
+    '''N independent AlienInvasionEnv games stepped together
+
+    step(actions) takes one action per game and returns stacked arrays.
+    A game that ends is reset straight away; its last observation is
+    returned in info['final_observation'].
+    '''
+
+    def __init__(self, count, **env_options):
+        '''Create count environments with the same options'''
+        self.envs = [AlienInvasionEnv(**env_options) for _ in range(count)]
+        self.steps = 0
+        self._started = time.perf_counter()
+
+    def reset(self):
+        '''Reset every game, return the stacked observations'''
+        self.steps = 0
+        self._started = time.perf_counter()
+        return np.stack([env.reset() for env in self.envs])
+
+    def step(self, actions):
+        '''Step game i with actions[i], return stacked results'''
+        observations, rewards, terminated, truncated = [], [], [], []
+        final_observations = {}
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            observation, reward, done, cut, info = env.step(int(action))
+            if done or cut:
+                final_observations[index] = observation
+                observation = env.reset()
+            observations.append(observation)
+            rewards.append(reward)
+            terminated.append(done)
+            truncated.append(cut)
+
+        self.steps += len(self.envs)
+        info = {'final_observation': final_observations}
+        return (np.stack(observations), np.array(rewards, dtype=np.float32),
+                np.array(terminated), np.array(truncated), info)
+
+    @property
+    def steps_per_sec(self):
+        '''Environment steps per second (all games) since the last reset'''
+        elapsed = time.perf_counter() - self._started
+        return self.steps / elapsed if elapsed else 0.0
+
+def main():
+    '''Step a VectorEnv with random actions and report its speed'''
+    parser = argparse.ArgumentParser(description='Alien Invasion RL environment speed test')
+    parser.add_argument('--envs', type=int, default=8, help='games stepped together')
+    parser.add_argument('--steps', type=int, default=2000, help='vector steps to run')
+    parser.add_argument('--observation', choices=('state', 'frame'), default='state')
+    args = parser.parse_args()
+
+    vector_env = VectorEnv(args.envs, observation=args.observation)
+    vector_env.reset()
+    rng = np.random.default_rng(0)
+    for _ in range(args.steps):
+        vector_env.step(rng.integers(len(ACTIONS), size=args.envs))
+    print(f'{args.envs} envs, {args.observation} observations: '
+          f'{vector_env.steps_per_sec:,.0f} steps/sec')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+import math
+from functools import lru_cache
+
+import numpy as np # type: ignore
+
+from entities import SlimAlien
+from fleet_grid import FleetGrid
+
+class Fleet:
+    '''A class to manage the whole alien fleet as NumPy arrays
+
+    Instead of one Alien sprite per alien, the fleet keeps x, y, width,
+    height and alive flags in contiguous arrays. Moving, dropping and the
+    edge / bottom tests are then one array operation each, no matter how
+    many aliens there are. Collisions go through a FleetGrid, so a bullet
+    is only tested against the aliens in the cells it covers.
+    '''
+
+    def __init__(self, ai_game):
+        '''Load the shared alien image and start with an empty fleet'''
+        self.screen = ai_game.screen
+        self.screen_rect = ai_game.screen.get_rect()
+        self.settings = ai_game.settings
+
+        # One prototype alien gives the image every alien is drawn with
+        prototype = SlimAlien.bind(ai_game)()
+        self.image = prototype.image
+        self.alien_size = prototype.rect.size # tuple (w,h)
+
+        self.grid = FleetGrid(*FleetTemplate.grid_sizes(self.alien_size))
+        self.x = None
+        self.reset([], [])
+
+    def empty(self):
+        '''Remove every alien from the fleet'''
+        self.alive.fill(False)
+        self.alive_count = 0
+
+    def reset(self, xs, ys):
+        '''Replace the fleet with one alien at each (xs[i], ys[i]) top left corner'''
+        self.reset_from(FleetTemplate(xs, ys, self.alien_size))
+
+    def reset_from(self, template):
+        '''Replace the fleet with a fresh copy of template's layout
+
+        The arrays are reused whenever the fleet size is unchanged, so a
+        new wave is a few array copies and no new objects.
+        '''
+        if self.x is None or len(self.x) != len(template.x):
+            # first wave with this layout -> make the arrays once
+            self.x = template.x.copy()
+            self.rect_x = template.rect_x.copy()
+            self.y = template.y.copy()
+            self.alive = np.ones(len(template.x), dtype=bool)
+        else:
+            np.copyto(self.x, template.x)
+            np.copyto(self.rect_x, template.rect_x)
+            np.copyto(self.y, template.y)
+            self.alive.fill(True)
+        # sizes never change -> share the template's read-only arrays
+        self.width = template.width
+        self.height = template.height
+        self.alive_count = len(template.x)
+        self.grid.share(template.grid)
+
+    def __len__(self):
+        '''Number of aliens still alive'''
+        return self.alive_count
+
+    def update(self, scale=1.0):
+        '''Move every alien to the right or left, scale = tick length in reference ticks'''
+        # Fleet_direction will represents left (-1) or right (1)
+        dx = self.settings.difficulty.alien_speed * self.settings.fleet_direction * scale
+        self.x += dx
+        self.rect_x = self._to_rect(self.x)
+        self.grid.move(dx, 0)
+
+    def drop(self, distance):
+        '''Move every alien down by distance pixels'''
+        self.y += distance
+        self.grid.move(0, distance)
+
+    def check_edges(self):
+        '''Return True if any living alien is at an edge of the screen'''
+        at_edge = ((self.rect_x + self.width >= self.screen_rect.right)
+                   | (self.rect_x <= 0))
+        return bool((at_edge & self.alive).any())
+
+    def check_bottom(self, bottom):
+        '''Return True if any living alien has reached the bottom y coord'''
+        return bool(((self.y + self.height >= bottom) & self.alive).any())
+
+    def collide_rect(self, rect):
+        '''Return True if any living alien overlaps rect'''
+        return bool(self._hits(rect.left, rect.top, rect.right, rect.bottom))
+
+    def collide_bullets(self, bullets):
+        '''Kill every alien hit by a bullet, like groupcollide(bullets, aliens, False, True)
+
+        Returns {bullet: [alien index, ...]}. Bullets are checked in group
+        order, so an alien hit by several bullets goes to the first one.
+        Each bullet only looks at the grid cells it covers -> cost grows
+        with the number of bullets, not bullets x aliens.
+
+        A bullet that moved further than its own height since the last
+        tick is tested along the whole segment it swept, from its old
+        position to its new one -> fast bullets can't jump over an alien.
+        '''
+        collisions = {}
+        if not self.alive_count or not len(bullets):
+            return collisions
+
+        # gap between a bullet's old and new rect, 0 while they still overlap
+        travel = getattr(bullets, 'travel', 0)
+        sweep = math.ceil(travel) if travel > self.settings.bullet_height else 0
+
+        # Box around the living aliens -> most bullets are still below the fleet
+        alive = self.alive
+        fleet_left = int(self.rect_x[alive].min())
+        fleet_right = int((self.rect_x + self.width)[alive].max())
+        fleet_top = int(self.y[alive].min())
+        fleet_bottom = int((self.y + self.height)[alive].max())
+
+        for bullet in bullets:
+            rect = bullet.rect
+            # bullets move up -> the swept segment reaches down to where it was
+            bottom = rect.bottom + sweep
+            if (rect.top >= fleet_bottom or bottom <= fleet_top
+                    or rect.left >= fleet_right or rect.right <= fleet_left):
+                continue
+            hit = self._hits(rect.left, rect.top, rect.right, bottom)
+            if hit:
+                self.kill(hit)
+                collisions[bullet] = hit
+        return collisions
+
+    def kill(self, indices):
+        '''Remove the aliens at the given indices from the fleet'''
+        self.alive[indices] = False
+        self.alive_count -= len(indices)
+
+    def positions(self):
+        '''Return a list of (x, y) rect positions for living aliens'''
+        return list(zip(self.rect_x[self.alive].tolist(), self.y[self.alive].tolist()))
+
+    def draw(self, surface):
+        '''Draw every living alien onto surface'''
+        surface.blits([(self.image, pos) for pos in self.positions()], False)
+
+    def _hits(self, left, top, right, bottom):
+        '''Return sorted indices of living aliens overlapping the given edges, same test as Rect.colliderect'''
+        candidates = self.grid.query(left, top, right, bottom)
+        if not candidates:
+            return candidates
+        hit = []
+        alive = self.alive
+        for index in candidates:
+            if not alive[index]:
+                continue
+            alien_x = self.rect_x[index]
+            alien_y = self.y[index]
+            if (alien_x < right and alien_x + self.width[index] > left
+                    and alien_y < bottom and alien_y + self.height[index] > top):
+                hit.append(index)
+        hit.sort()
+        return hit
+
+    @staticmethod
+    def _to_rect(x):
+        '''Round float positions the way assigning to Rect.x does (half away from zero)'''
+        return np.trunc(x + np.copysign(0.5, x)).astype(np.int64)
+
+class FleetTemplate:
+    '''The starting layout of a fleet, worked out once and copied for every wave'''
+
+    def __init__(self, xs, ys, alien_size):
+        '''Store the positions, sizes and collision grid for one alien per (xs[i], ys[i])'''
+        alien_width, alien_height = alien_size
+        # exact horizontal positions as floats, like Alien.x
+        self.x = np.array(xs, dtype=np.float64)
+        # integer rect positions, like Alien.rect.x / Alien.rect.y
+        self.rect_x = Fleet._to_rect(self.x)
+        self.y = np.array(ys, dtype=np.int64)
+        self.width = np.full(len(self.x), alien_width, dtype=np.int64)
+        self.height = np.full(len(self.x), alien_height, dtype=np.int64)
+        # every fleet made from this template shares these -> keep them read-only
+        for array in (self.x, self.rect_x, self.y, self.width, self.height):
+            array.flags.writeable = False
+
+        self.grid = FleetGrid(*self.grid_sizes(alien_size))
+        self.grid.build(xs, ys)
+
+    @staticmethod
+    def grid_sizes(alien_size):
+        '''Return (cell size, item size) of the collision grid for aliens of alien_size'''
+        alien_width, alien_height = alien_size
+        # Aliens are laid out one alien apart -> one grid cell per alien slot
+        return (2 * alien_width, 2 * alien_height), alien_size
+
+@lru_cache(maxsize=16)
+def fleet_template(screen_width, screen_height, alien_size):
+    '''Return the full-fleet layout for this screen and alien size, computed only once'''
+    # Create an alien and keep adding until there's no room left
+    # Spacing between aliens is one alien width and one alien height
+    alien_width, alien_height = alien_size # tuple (w,h)
+    # set xy coord for first alien
+    current_x, current_y = alien_width, alien_height
+    xs, ys = [], []
+
+    # as long as space left is larger than one alien width -> can add 1 more
+    while current_y < (screen_height - 3 * alien_height):
+        while current_x < (screen_width - 2 * alien_width):
+            xs.append(current_x)
+            ys.append(current_y)
+            current_x += 2 * alien_width
+
+        # Finished a row, starting to draw first alien of next row
+        # Hence, x coord returns to initial position, y coord move 1 row down
+        current_x = alien_width
+        current_y += 2 * alien_height
+
+    return FleetTemplate(xs, ys, alien_size)
@@ -0,0 +1,75 @@
+class FleetGrid:
+    '''A uniform grid over the fleet layout for cheap collision lookups
+
+    Aliens are filed into cells by their starting position. The whole
+    fleet always moves together, so moving it only shifts the grid's
+    offset. The cells never change after build(), so grids for the same
+    layout can share them (see share()); dead aliens are filtered out by
+    the caller. A query looks at the few cells under a rect instead of
+    every alien.
+    '''
+
+    def __init__(self, cell_size, item_size):
+        '''Initialize an empty grid with cells of cell_size holding items of item_size'''
+        self.cell_width, self.cell_height = cell_size
+        self.item_width, self.item_height = item_size
+        self.build([], [])
+
+    def build(self, xs, ys):
+        '''File item i into the cell containing (xs[i], ys[i])'''
+        # {(row, col): [item index, ...]}
+        self.cells = {}
+        # how far the fleet has moved since the grid was built
+        self.offset_x = 0.0
+        self.offset_y = 0
+        for index, (x, y) in enumerate(zip(xs, ys)):
+            key = (int(y // self.cell_height), int(x // self.cell_width))
+            self.cells.setdefault(key, []).append(index)
+
+        # occupied row / col range -> queries outside it return straight away
+        rows = [row for row, col in self.cells] or [0]
+        cols = [col for row, col in self.cells] or [0]
+        self.first_row, self.last_row = min(rows), max(rows)
+        self.first_col, self.last_col = min(cols), max(cols)
+
+    def share(self, other):
+        '''Use the cells of other, a grid built for the same layout, from offset (0, 0)'''
+        self.cells = other.cells
+        self.first_row, self.last_row = other.first_row, other.last_row
+        self.first_col, self.last_col = other.first_col, other.last_col
+        self.offset_x = 0.0
+        self.offset_y = 0
+
+    def move(self, dx, dy):
+        '''Shift every item by (dx, dy)'''
+        self.offset_x += dx
+        self.offset_y += dy
+
+    def query(self, left, top, right, bottom):
+        '''Return indices of items that may overlap the given edges
+
+        Candidates are a superset of the real overlaps (positions are
+        rounded to whole pixels, so one pixel of slack is allowed on x);
+        callers still do the exact rect test.
+        '''
+        # rect in the grid's own coordinates, before the fleet moved
+        top -= self.offset_y
+        bottom -= self.offset_y
+        first_row = int((top - self.item_height) // self.cell_height)
+        last_row = int(bottom // self.cell_height)
+        if last_row < self.first_row or first_row > self.last_row:
+            return []
+
+        left -= self.offset_x
+        right -= self.offset_x
+        first_col = int((left - self.item_width - 1) // self.cell_width)
+        last_col = int((right + 1) // self.cell_width)
+
+        cells = self.cells
+        found = []
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                cell = cells.get((row, col))
+                if cell:
+                    found += cell
+        return found
@@ -0,0 +1,32 @@
+class TickInput:
+    '''A class to hold the player's input for one simulation tick'''
+
+    def __init__(self, left=False, right=False, fire=False, play=False):
+        '''Initialize the input state, default = no keys pressed'''
+        # Held keys - stay True for as long as the arrow key is down
+        self.left = left
+        self.right = right
+        # One-shot actions - True only on the tick the key / button was pressed
+        self.fire = fire
+        self.play = play
+
+    def clear_actions(self):
+        '''Reset the one-shot actions once a tick has consumed them'''
+        self.fire = False
+        self.play = False
+
+    def copy(self):
+        '''Return an independent copy of this input state'''
+        return TickInput(self.left, self.right, self.fire, self.play)
+
+    def __eq__(self, other):
+        return (isinstance(other, TickInput)
+                and (self.left, self.right, self.fire, self.play)
+                == (other.left, other.right, other.fire, other.play))
+
+    def __repr__(self):
+        return (f'TickInput(left={self.left}, right={self.right}, '
+                f'fire={self.fire}, play={self.play})')
+
+# Input for a tick where the player does nothing
+NO_INPUT = TickInput()
@@ -8,7 +8,8 @@ class GameStats:
         self.reset_stats()
 
         # High score should never be reset
-        self.high_score = 0
+        # -> start from the saved one, read once at startup (no I/O during play)
+        self.high_score = ai_game.store.high_score if ai_game.store else 0
 
     def reset_stats(self):
         '''Initialize stats that can change during the game'''
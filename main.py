@@ -1,5 +1,10 @@
+import argparse
+import os
 import sys
-from time import sleep
+from time import perf_counter, perf_counter_ns
+
+# Startup is timed from here -> includes importing pygame and the game modules
+STARTED = perf_counter()
 
 import pygame # type: ignore
 
@@ -7,40 +12,117 @@ from settings import Settings
 from game_stats import GameStats
 from scoreboard import Scoreboard
 from ship import Ship
-from bullet import Bullet
-from alien import Alien
+from bullet_pool import BulletPool
+from fleet import Fleet, fleet_template
 from button import Button
+from game_input import TickInput, NO_INPUT
+from dirty_rects import DirtyRectRenderer
+from batch_renderer import BatchRenderer
+from replay import InputRecorder, InputLog
+from profiler import FrameProfiler
+from assets import assets
+from surface_prep import make_background, blit_cost_report
+from persistence import StatsStore
+from capture import FrameCapture
+from memory_tracker import MemoryTracker
+from null_screen import NullScreen
 
 class AlienInvasion:
     '''Overall class to manage game assets and behavior'''
 
-    def __init__(self):
-        '''Initialize the game, create game resources'''
-
-        # Initialize the background settings Pygame needs to work properly
-        pygame.init()
+    def __init__(self, headless=False, screen_size=None, store=None, render=True,
+                 playfield_size=None):
+        '''Initialize the game, create game resources
+
+        headless=True runs the simulation without a display window:
+        everything draws to an off-screen surface of screen_size (or the
+        size in Settings) and only step() should be used to drive the game.
+        render=False (headless only) goes further and gives the game no
+        surface at all, just its size -> nothing can be drawn, but hundreds
+        of games fit in memory.
+
+        playfield_size sets the logical size the game plays on when it differs
+        from the window / full screen size; the frame is drawn at that size
+        and scaled onto the display (smaller = less to draw every frame).
+
+        store is an optional StatsStore: the high score starts from its saved
+        value and every game / cleared level is written to it.
+        '''
+        # {stage: ms since STARTED} -> see startup_report()
+        # ('imports' also covers the command line and opening the stats store)
+        self.startup = {}
+        self._mark('imports')
+
+        self.headless = headless
+        if headless:
+            # SDL dummy driver -> no window and no display server needed
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+        # Initialize only the Pygame modules the game uses
+        # (pygame.init() would also start audio, joystick ... which take time and aren't needed)
+        pygame.display.init()
+        pygame.font.init()
+        self._mark('pygame_init')
 
         # create an instance of the class Clock, to control frame rate of the game
         # ensure clock ticks once on each pass through main loop
         # -> calculate amount of time to pause so that game runs at consistent rate
         self.clock = pygame.time.Clock()
         self.settings = Settings()
-
-        # Full screen mode
-        # pygame.FULLSCREEN: figure out a window size that will fill the screen
-        self.screen = pygame.display.set_mode((0,0), pygame.FULLSCREEN)
-        self.settings.screen_width = self.screen.get_rect().width
-        self.settings.screen_height = self.screen.get_rect().height
+        if screen_size:
+            self.settings.screen_width, self.settings.screen_height = screen_size
+        if playfield_size:
+            self.settings.screen_width, self.settings.screen_height = playfield_size
+
+        if headless and not render:
+            # Size only - the simulation never needs the pixels
+            self.screen = NullScreen((self.settings.screen_width, self.settings.screen_height))
+        elif headless:
+            # Off-screen surface - game elements draw here exactly as they would on the window
+            self.screen = pygame.Surface(
+                (self.settings.screen_width, self.settings.screen_height)
+            )
+        elif screen_size:
+            # Custom mode
+            self.screen = pygame.display.set_mode(screen_size)
+        else:
+            # Full screen mode
+            # pygame.FULLSCREEN: figure out a window size that will fill the screen
+            self.screen = pygame.display.set_mode((0,0), pygame.FULLSCREEN)
+            # an explicit playfield_size always wins over the monitor size
+            if not self.settings.fixed_playfield and not playfield_size:
+                self.settings.screen_width = self.screen.get_rect().width
+                self.settings.screen_height = self.screen.get_rect().height
+
+        # Part of the display the playfield is scaled into, None = drawn on the display directly
+        self.display_view = None
+        playfield_size = (self.settings.screen_width, self.settings.screen_height)
+        if not headless and self.screen.get_size() != playfield_size:
+            self._make_playfield(playfield_size)
 
         # Create a display window, (1200,800) is the dimensions of game window
         # 1200 pixels wide by 800 pixels high
         # the object we assign to self.screen is a surface - game elements can be display
-
-        # Custom mode
-        # self.screen = pygame.display.set_mode(
-        #     (self.settings.screen_width, self.settings.screen_height)
-        # )
-        pygame.display.set_caption("Alien Invasion")
+        if not headless:
+            pygame.display.set_caption("Alien Invasion")
+            # Screen exists now -> every image is converted to its pixel format when loaded
+            # (must run before the sprites below load their images)
+            assets.prepare(rle=self.settings.rle_sprites, background=self.settings.bg_color)
+
+        self._mark('display')
+
+        # Optional background layer in the screen's pixel format, cleared with one blit per frame
+        self.background = None
+        if self.settings.background_layer:
+            self.background = make_background(self.screen, self.settings.bg_color)
+
+        # Saved high score and session stats (None -> nothing is kept between launches)
+        self.store = store
+        # id of the current game in the store, tick and time it started, tick the level started
+        self.game_id = None
+        self.game_start_tick = 0
+        self.game_started = 0.0
+        self.level_start_tick = 0
 
         # Create an instance to store game statistics & create scoreboard
         self.stats = GameStats(self)
@@ -50,37 +132,191 @@ class AlienInvasion:
         # -> give access to the game's resources (ie. screen object)
         self.ship = Ship(self)
 
-        # create a group that holds the bullets & fleet of aliens
-        self.bullets = pygame.sprite.Group()
-        self.aliens = pygame.sprite.Group()
-        self._create_fleet()
-
-        # Start Alien Invasion in active state
-        self.game_active = True
+        # create a pool that holds and recycles the bullets
+        self.bullets = BulletPool(self)
+        # the fleet of aliens keeps positions in arrays rather than one sprite per alien
+        # (it stays empty until Play is clicked -> _start_game() builds the first wave)
+        self.aliens = Fleet(self)
 
         # Start Alien Invasion in an inactive state
         self.game_active = False
 
+        # Number of simulation ticks run so far
+        self.ticks = 0
+        # Ticks left to wait after the ship is hit, game is frozen while > 0
+        self.pause_ticks = 0
+
+        # Input collected from the keyboard and mouse for the next tick
+        self.input = TickInput()
+        # Set to an InputRecorder to log the input of every tick
+        self.recorder = None
+        # Set to a FrameProfiler to time every phase of the main loop
+        self.profiler = None
+        # Set to a FrameCapture to save every drawn frame
+        self.capture = None
+        # Set to a MemoryTracker to check memory stays flat from wave to wave
+        self.memory = None
+
         # Make the Play button
         self.play_button = Button(self, 'Play')
 
+        # Optionally redraw only what changed instead of the full screen
+        self.dirty_renderer = None
+        if self.settings.dirty_rect_rendering:
+            self.dirty_renderer = DirtyRectRenderer(self)
+        # or draw full frames with one fill + one blits() call
+        self.batch_renderer = None
+        if self.settings.batch_rendering and render:
+            self.batch_renderer = BatchRenderer(self)
+        self._mark('game_objects')
+
+    def _make_playfield(self, size):
+        '''Draw on an off-screen surface of size and scale it onto the display every frame
+
+        The game always plays on the same logical playfield (same fleet,
+        same work per tick) whatever the monitor resolution; the display
+        only shows it bigger or smaller, letterboxed to keep its shape.
+        '''
+        display = self.screen
+        display_width, display_height = display.get_size()
+        scale = min(display_width / size[0], display_height / size[1])
+        view = pygame.Rect(0, 0, round(size[0] * scale), round(size[1] * scale))
+        view.center = display.get_rect().center
+
+        # bars around the playfield never change -> paint them once
+        display.fill((0, 0, 0))
+        # the scale target is allocated here once, not every frame
+        self.display_view = display.subsurface(view)
+        self.screen = pygame.Surface(size).convert()
+
+    def _present(self):
+        '''Show the finished frame on the display'''
+        if self.headless:
+            return
+        if self.display_view is not None:
+            # one scale per frame, straight into the display
+            pygame.transform.scale(self.screen, self.display_view.get_size(), self.display_view)
+        pygame.display.flip()
+
+    def _to_playfield(self, pos):
+        '''Turn a display position (mouse) into a playfield position'''
+        if self.display_view is None:
+            return pos
+        view_x, view_y = self.display_view.get_abs_offset()
+        view_width, view_height = self.display_view.get_size()
+        return ((pos[0] - view_x) * self.settings.screen_width // view_width,
+                (pos[1] - view_y) * self.settings.screen_height // view_height)
+
+    def _mark(self, stage):
+        '''Record when a startup stage finished'''
+        self.startup[stage] = (perf_counter() - STARTED) * 1000
+
+    def startup_report(self):
+        '''Draw the first frame, return [(stage, ms since start, ms for the stage)]'''
+        self._update_screen()
+        self._mark('first_frame')
+        report = []
+        previous = 0.0
+        for stage, ms in self.startup.items():
+            report.append((stage, ms, ms - previous))
+            previous = ms
+        return report
+
     def run_game(self):
         '''Start the main loop for the game'''
+        # Simulation always advances in fixed steps of 1 / tick_rate seconds
+        # -> rendering speed never changes how fast the game plays
+        tick_ms = 1000 / self.settings.tick_rate
+        lag = 0.0
 
         while True:
+            profiler = self.profiler
+            if profiler:
+                start = perf_counter_ns()
+
             # adding a helper method
             self._check_events()
-
-            if self.game_active: # is True
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
-
+            if profiler:
+                profiler.lap('events', start)
+
+            # Run as many fixed ticks as the elapsed real time calls for
+            # (capped, so a long stall doesn't make the game race to catch up;
+            # the part of a tick left over is kept -> steady frame rates lose nothing)
+            lag = min(lag, self.settings.max_catch_up_ms)
+            while lag >= tick_ms:
+                self.step(self.input)
+                self.input.clear_actions()
+                lag -= tick_ms
+
+            if profiler:
+                start = perf_counter_ns()
             self._update_screen()
+            if profiler:
+                profiler.lap('screen', start)
+                profiler.end_frame()
 
             # make the clock tick at the end of a while loop
-            # frame rate for the game <- Python makes the loop run 60 times per second
-            self.clock.tick(60)
+            # frame rate for the game <- at most frame_rate passes per second (0 = uncapped)
+            lag += self.clock.tick(self.settings.frame_rate)
+
+    def run_replay(self, log, realtime=True):
+        '''Feed a recorded InputLog through the game, tick by tick
+
+        realtime=False runs the ticks back to back as fast as possible
+        (and draws nothing when headless).
+        '''
+        for inputs in log:
+            self.step(inputs)
+            if self.headless:
+                # nothing to show, frames are only drawn off-screen for a capture
+                if self.capture:
+                    self._update_screen()
+                continue
+
+            # only quitting is read from the keyboard / mouse during a replay
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (
+                        event.type == pygame.KEYDOWN and event.key == pygame.K_q):
+                    return
+            self._update_screen()
+            if realtime:
+                self.clock.tick(self.settings.tick_rate)
+
+    def step(self, inputs=NO_INPUT):
+        '''Advance the game by one fixed tick, no drawing or event handling'''
+        if self.recorder:
+            self.recorder.record(inputs)
+
+        if inputs.play and not self.game_active:
+            self._start_game()
+
+        # Arrow keys held down -> continuous motion
+        self.ship.moving_left = inputs.left
+        self.ship.moving_right = inputs.right
+
+        if self.game_active: # is True
+            if self.pause_ticks:
+                # Ship was just hit -> freeze the game for a moment
+                self.pause_ticks -= 1
+            else:
+                profiler = self.profiler
+                if profiler:
+                    start = perf_counter_ns()
+                # dt = 1 / tick_rate seconds -> speeds scaled to the length of this tick
+                scale = self.settings.speed_reference_rate / self.settings.tick_rate
+                if inputs.fire:
+                    self._fire_bullet()
+                self.ship.update(scale)
+                if profiler:
+                    start = profiler.lap('ship', start)
+                self._update_bullets(scale)
+                if profiler:
+                    start = profiler.lap('bullets', start)
+                self._update_aliens(scale)
+                if profiler:
+                    profiler.lap('aliens', start)
+
+        self.ticks += 1
 
     def _check_events(self):
         '''Respond to keypresses and mouse events'''
@@ -89,21 +325,25 @@ class AlienInvasion:
         # pygame.event.get() -> access the events that Pygame detects
         # -> returns list of events that was done since last time function was called
         for event in pygame.event.get():
-            # pygame.QUIT = player clicks the window's close button
-            if event.type == pygame.QUIT:
-                # call sys.exit() to exit the game
-                sys.exit()
-            # press key - this pair will allow continuous motion
-            elif event.type == pygame.KEYDOWN:
-                self._check_keydown_events(event)
-            # release key
-            elif event.type == pygame.KEYUP:
-                self._check_keyup_events(event)
-            # detect when player clicks anywhere on the screen
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                # return mouse cursor's x and y coord
-                mouse_pos = pygame.mouse.get_pos() 
-                self._check_play_button(mouse_pos)
+            self._handle_event(event)
+
+    def _handle_event(self, event):
+        '''Apply one keyboard / mouse event to the input of the next tick'''
+        # pygame.QUIT = player clicks the window's close button
+        if event.type == pygame.QUIT:
+            # call sys.exit() to exit the game
+            sys.exit()
+        # press key - this pair will allow continuous motion
+        elif event.type == pygame.KEYDOWN:
+            self._check_keydown_events(event)
+        # release key
+        elif event.type == pygame.KEYUP:
+            self._check_keyup_events(event)
+        # detect when player clicks anywhere on the screen
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            # return mouse cursor's x and y coord
+            mouse_pos = self._to_playfield(pygame.mouse.get_pos())
+            self._check_play_button(mouse_pos)
 
     def _check_play_button(self, mouse_pos):
         '''Start a new game when player clicks Play'''
@@ -112,83 +352,103 @@ class AlienInvasion:
         # check whether point of mouse click overlaps region defined by Play button's rect
         # clicks to Play button only works when Play button is visible
         if button_clicked and not self.game_active:
-            # Reset game settings
-            self.settings.initialize_dynamic_settings()
+            # game starts on the next tick
+            self.input.play = True
+
+    def _start_game(self):
+        '''Reset settings, stats and sprites for a new game'''
+        # Reset game settings
+        self.settings.initialize_dynamic_settings()
+
+        # Reset game statistics
+        self.stats.reset_stats()
+        self.sb.prep_score() # reset to 0
+        self.sb.prep_level()
+        self.sb.prep_ships()
+        self.game_active = True
+        self.pause_ticks = 0
 
-            # Reset game statistics
-            self.stats.reset_stats()
-            self.sb.prep_score() # reset to 0
-            self.sb.prep_level()
-            self.sb.prep_ships()
-            self.game_active = True
+        self.game_start_tick = self.level_start_tick = self.ticks
+        self.game_started = perf_counter()
+        if self.store:
+            self.game_id = self.store.start_game()
 
-            # Get rid of remaining bullets and aliens
-            self.bullets.empty()
-            self.aliens.empty()
+        # Get rid of remaining bullets and aliens
+        self.bullets.empty()
+        self.aliens.empty()
 
-            # Create new fleet and center the ship
-            self._create_fleet()
-            self.ship.center_ship()
+        # Create new fleet and center the ship
+        self._create_fleet()
+        self.ship.center_ship()
+
+        # Hide mouse cursor
+        self._set_cursor_visible(False)
 
-            # Hide mouse cursor
-            pygame.mouse.set_visible(False)
+    def _set_cursor_visible(self, visible):
+        '''Show or hide the mouse cursor, headless games have no cursor'''
+        if not self.headless:
+            pygame.mouse.set_visible(visible)
 
     def _check_keydown_events(self, event):
         '''Respond to key presses'''
         # check whether key pressed is right arrow key
         if event.key == pygame.K_RIGHT:
             # Move the ship to the right
-            self.ship.moving_right = True
+            self.input.right = True
         # can use elif here because each event is connected to only one key - keydown
         elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = True
+            self.input.left = True
         # press Q for quit
         elif event.key == pygame.K_q:
             sys.exit()
         elif event.key == pygame.K_SPACE:
-            self._fire_bullet()
+            # bullet is fired on the next tick
+            self.input.fire = True
+        # press F3 to show / hide the profiler overlay
+        elif event.key == pygame.K_F3 and self.profiler:
+            self.profiler.show_overlay = not self.profiler.show_overlay
+            # the dirty-rect renderer doesn't track the overlay -> repaint everything once
+            if self.dirty_renderer:
+                self.dirty_renderer.invalidate()
 
     def _check_keyup_events(self, event):
         '''Respond to key releases'''
         if event.key == pygame.K_RIGHT:
-            self.ship.moving_right = False
+            self.input.right = False
         elif event.key == pygame.K_LEFT:
-            self.ship.moving_left = False
+            self.input.left = False
 
     def _fire_bullet(self):
-        '''Create a new bullet and ad it to the bullets group'''
+        '''Fire a bullet from the pool at the top of the ship'''
         if len(self.bullets) < self.settings.bullets_allowed:
-            new_bullet = Bullet(self)
-            # add() is similar to append() but specifically for Pygame groups
-            self.bullets.add(new_bullet)
+            # fire() reuses an idle bullet rather than creating a new one
+            self.bullets.fire(self.ship.rect.midtop)
 
-    def _update_bullets(self):
+    def _update_bullets(self, scale=1.0):
         '''Update position of bullets and get rid of old bullets'''
-        # Update bullet positions - when calls update() on a group 
-        # -> automatically calls update() for each sprite in the group
-        self.bullets.update()
+        # Update bullet positions - calls update() for each bullet in flight
+        self.bullets.update(scale)
+        # Collisions first: a fast bullet may have swept through the fleet
+        # and out of the top of the screen in this same tick
+        self._check_bullet_alien_collisions()
         # Get rid of bullets that have disappeared
-        # we can't remove items from a list or group within a for loop -> have to loop over a copy
-        # -> free to modify the bullet group
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
+        # the pool moves them back to its idle part in place -> no copy of the group needed
+        self.bullets.remove_expired()
         # check for number of bullets on screen
         # print(len(self.bullets))
-        self._check_bullet_alien_collisions()
 
     def _check_bullet_alien_collisions(self):
         # check for any bullets that have hit aliens -> get rid of bullet and alien
         # this code compares positions of all bullets & aliens -> identifies overlap
         # if an overlap exists -> a key-value pair added to dictionary it returns
         # False True = after collision, bullet doesn't disappear (False) alien disappears (True)
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, False, True)
+        collisions = self.aliens.collide_bullets(self.bullets)
 
-        # collisions is a dict: {bullet_hit: [alien 1, alien 2, alien 3]}
+        # collisions is a dict: {bullet_hit: [alien index 1, alien index 2, alien index 3]}
         if collisions:
             # loop through list of values, add points for each alien hit
             for aliens in collisions.values():
-                self.stats.score += self.settings.alien_points * len(aliens)
+                self.stats.score += self.settings.difficulty.alien_points * len(aliens)
             self.sb.prep_score()
             self.sb.check_high_score()
 
@@ -202,21 +462,33 @@ class AlienInvasion:
             # Increase game speed when last alien been shot down
             self.settings.increase_speed()
 
+            if self.store:
+                self.store.end_level(self.game_id, self.stats.level, self.stats.score,
+                                     self.ticks - self.level_start_tick, self.stats.ships_left)
+            self.level_start_tick = self.ticks
+
             # Increase level
             self.stats.level += 1
             self.sb.prep_level()
 
-    def _update_aliens(self):
+    def jump_to_level(self, level):
+        '''Go straight to level with a fresh fleet (stress tests, replays of late levels)'''
+        # difficulty of any level is one lookup in the precomputed table
+        self.settings.set_level(level)
+        self.stats.level = level
+        self.sb.prep_level()
+        self.bullets.empty()
+        self._create_fleet()
+        self.level_start_tick = self.ticks
+
+    def _update_aliens(self, scale=1.0):
         '''Check if the fleet is at an edge, then update positions'''
         self._check_fleet_edges()
-        self.aliens.update()
+        self.aliens.update(scale)
 
         # Look for alien-ship collisions
-        # function takes 2 arg: a sprite and a group, 
-        # - looking for any member of group colliding with the sprite
-        # - stop looping through the group as soon as it finds one collision
-        # - if no collisions -> return None -> if block doesnt get executed
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        # one array test checks the ship's rect against every living alien at once
+        if self.aliens.collide_rect(self.ship.rect):
             self._ship_hit()
 
         # Look for aliens hitting bottom of screen
@@ -224,49 +496,25 @@ class AlienInvasion:
 
     def _create_fleet(self):
         '''Create the fleet of aliens'''
-        # Create an alien and keep adding until there's no room left
-        # Spacing between aliens is one alien width and one alien height
-        # Make an alien
-        alien = Alien(self)
-
-        # grab alien's width and height from size attribute of an alien rect
-        alien_width, alien_height = alien.rect.size # tuple (w,h)
-        # set xy coord for first alien
-        current_x, current_y = alien_width, alien_height
-
-        # as long as space left is larger than one alien width -> can add 1 more
-        while current_y < (self.settings.screen_height - 3 * alien_height):
-            while current_x < (self.settings.screen_width - 2 * alien_width):
-                self._create_alien(current_x, current_y)
-                current_x += 2 * alien_width
-            
-            # Finished a row, starting to draw first alien of next row
-            # Hence, x coord returns to initial position, y coord move 1 row down
-            current_x = alien_width
-            current_y += 2 * alien_height
-
-    def _create_alien(self, x_position, y_position):
-        '''Create an alien and place it in the row'''
-        new_alien = Alien(self)
-        new_alien.x = x_position
-        # position new alien's rect at this same x value
-        new_alien.rect.x = x_position
-        new_alien.rect.y = y_position
-        # add new alien to the fleet
-        self.aliens.add(new_alien)
-        
+        # The layout for this screen size is worked out once and cached
+        # -> every new wave only copies it into the fleet's arrays
+        template = fleet_template(
+            self.settings.screen_width, self.settings.screen_height, self.aliens.alien_size
+        )
+        self.aliens.reset_from(template)
+        # every new game, cleared level and ship hit starts a wave here
+        if self.memory:
+            self.memory.wave()
+
     def _check_fleet_edges(self):
         '''Respond appropriately if any aliens have reached an edge'''
-        for alien in self.aliens.sprites():
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        if self.aliens.check_edges():
+            self._change_fleet_direction()
 
     def _change_fleet_direction(self):
         '''Drop the fleet and change its direction'''
-        for alien in self.aliens.sprites():
-            # Move down so y coord increase
-            alien.rect.y += self.settings.fleet_drop_speed
+        # Move down so y coord increase
+        self.aliens.drop(self.settings.fleet_drop_speed)
         # Change direction -> multiple by (-1)
         self.settings.fleet_direction *= -1
 
@@ -287,54 +535,233 @@ class AlienInvasion:
             self.ship.center_ship()
 
             # Pause game for (second) when ship is hit
-            sleep(0.5)
+            # counted in ticks instead of sleep() -> window stays responsive, headless runs don't wait
+            self.pause_ticks = round(self.settings.ship_hit_pause * self.settings.tick_rate)
         else:
             self.game_active = False
+            if self.store:
+                self.store.end_game(self.game_id, self.stats.level, self.stats.score,
+                                    self.ticks - self.game_start_tick,
+                                    perf_counter() - self.game_started)
             # set_visible() -> tell Pygame to hide / show cursor
-            pygame.mouse.set_visible(True)
+            self._set_cursor_visible(True)
 
     def _check_aliens_bottom(self):
         '''Check if any aliens have reached the bottom of the screen'''
-        for alien in self.aliens.sprites():
-            if alien.rect.bottom >= self.settings.screen_height:
-                # Treat this the same as if ship got hit
-                self._ship_hit()
-                break
+        if self.aliens.check_bottom(self.settings.screen_height):
+            # Treat this the same as if ship got hit
+            self._ship_hit()
 
     def _update_screen(self):
         '''Update images on the screen and flip to the new screen'''
-        # Redraw the screen during each pass through the loop
-        # .fill() -> fill the screen with background color, acts on a surface and takes one arg (a color)
-        self.screen.fill(self.settings.bg_color)
-
-        # each bullet is drawn to the screen
-        # bullets.sprites(): return a list of all sprites in the group bullets
-        # to draw all bullets -> loop through the sprites in <bullets> ...
-        # ... and call draw_bullet() on each one
-        for bullet in self.bullets.sprites():
-            bullet.draw_bullet()
-
-        # Call blitme() -> draw image of ship at bottom center of screen
-        self.ship.blitme()
-
-        # draw() on a group -> each element is drawn at the position defined by its rect attribute
-        # draw() requires a surface on which to draw the elements
-        self.aliens.draw(self.screen)
+        if self.dirty_renderer:
+            # Only redraw and push the parts of the screen that changed
+            self.dirty_renderer.draw()
+            overlay = []
+            if self._show_profiler_overlay() and not self.headless:
+                overlay.append(self.profiler.draw_overlay(self.screen, self))
+            # one push per frame, overlay included
+            self.dirty_renderer.present(overlay)
+        else:
+            self._redraw_screen()
 
-        # Draw the score information
-        self.sb.show_score()
+        # Frame is finished -> hand a copy to the capture stage (never waits on the disk)
+        if self.capture:
+            self.capture.capture()
 
-        # Draw the play button if game is inactive
-        if not self.game_active:
-            self.play_button.draw_button()
+    def _redraw_screen(self):
+        '''Draw every game element from scratch and flip'''
+        if self.batch_renderer:
+            # Every sprite in one blits() call from the shared atlas
+            self.batch_renderer.draw()
+        else:
+            # Redraw the screen during each pass through the loop
+            # .fill() -> fill the screen with background color, acts on a surface and takes one arg (a color)
+            # or blit the pre-rendered background layer -> clears the whole screen in one call
+            if self.background is None:
+                self.screen.fill(self.settings.bg_color)
+            else:
+                self.screen.blit(self.background, (0, 0))
+
+            # each bullet is drawn to the screen
+            # to draw all bullets -> loop through the bullets in flight ...
+            # ... and call draw_bullet() on each one
+            for bullet in self.bullets:
+                bullet.draw_bullet()
+
+            # Call blitme() -> draw image of ship at bottom center of screen
+            self.ship.blitme()
+
+            # draw() on a group -> each element is drawn at the position defined by its rect attribute
+            # draw() requires a surface on which to draw the elements
+            self.aliens.draw(self.screen)
+
+            # Draw the score information
+            self.sb.show_score()
+
+            # Draw the play button if game is inactive
+            if not self.game_active:
+                self.play_button.draw_button()
+
+        # Draw frame timings on top of everything
+        if self._show_profiler_overlay():
+            self.profiler.draw_overlay(self.screen, self)
 
         # Make the most recently drawn screen visible
         # continually updates display to show new positions of game elements & hide old ones
         # -> create illusion of smooth movement
-        pygame.display.flip()
+        # headless games draw to an off-screen surface -> nothing to flip
+        self._present()
+
+    def _show_profiler_overlay(self):
+        '''Return True if the profiler overlay should be drawn'''
+        return self.profiler is not None and self.profiler.show_overlay
+
+def _save_memory_report(memory, path):
+    '''Write the memory report and print whether memory stayed flat'''
+    report = memory.save(path)
+    memory.close()
+    if report['flat'] is None:
+        print(f"memory: only {report['waves']} waves, more than {report['growth_window']} "
+              f"needed to tell -> {path}")
+    elif report['flat']:
+        print(f"memory: flat over {report['waves']} waves -> {path}")
+    else:
+        print(f"memory: growing {', '.join(report['growing'])} over {report['waves']} waves -> {path}")
+
+def _positive_int(text):
+    '''argparse type: an int of at least 1'''
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f'must be at least 1, got {value}')
+    return value
+
+def parse_args():
+    '''Read the command line options'''
+    parser = argparse.ArgumentParser(description='Alien Invasion')
+    parser.add_argument('--record', metavar='PATH',
+                        help='record the input of every tick to PATH')
+    parser.add_argument('--replay', metavar='PATH',
+                        help='play back a session recorded with --record')
+    parser.add_argument('--fast', action='store_true',
+                        help='replay headless, as fast as possible, and print the final stats')
+    parser.add_argument('--startup-report', action='store_true',
+                        help='print how long each startup stage and the first frame took, then exit')
+    parser.add_argument('--blit-report', action='store_true',
+                        help='print the cost of raw vs display-format blits and exit')
+    parser.add_argument('--profile', action='store_true',
+                        help='time every frame phase and show the overlay (F3 toggles it)')
+    parser.add_argument('--profile-out', metavar='PATH',
+                        help='with --profile, write per-frame timings to PATH (.csv or .json) on exit')
+    parser.add_argument('--async', dest='async_loop', action='store_true',
+                        help='run input, simulation and drawing as asyncio tasks, print input latency on exit')
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help='push only the changed parts of the screen, print pixels pushed on exit')
+    parser.add_argument('--capture', metavar='DIR',
+                        help='save drawn frames to DIR (also works with --replay --fast)')
+    parser.add_argument('--capture-format', choices=('png', 'raw'), default='png',
+                        help='PNG files or one raw RGB stream (default: png)')
+    parser.add_argument('--capture-every', type=_positive_int, default=1, metavar='N',
+                        help='save every Nth frame')
+    parser.add_argument('--playfield', type=_positive_int, nargs=2, metavar=('WIDTH', 'HEIGHT'),
+                        help='logical playfield size, scaled to the full screen (smaller = less work)')
+    parser.add_argument('--memory-report', metavar='PATH',
+                        help='trace memory at every wave and write a JSON leak report at exit')
+    parser.add_argument('--memory-waves', type=_positive_int, default=5, metavar='N',
+                        help='flag anything that grows N waves in a row (default: 5)')
+    parser.add_argument('--fps', type=int, metavar='N',
+                        help='draw at most N frames per second, e.g. 30, 60, 144 or 0 for uncapped')
+    parser.add_argument('--tick-rate', type=_positive_int, metavar='N',
+                        help='simulation ticks per second (game speed stays the same)')
+    parser.add_argument('--stats-db', metavar='PATH', default='alien_invasion.db',
+                        help='SQLite file that keeps the high score and game stats')
+    parser.add_argument('--no-save', action='store_true',
+                        help='keep nothing between launches')
+    return parser.parse_args()
 
 if __name__ == '__main__':
+    args = parse_args()
+
+    if args.replay:
+        # A replay needs the same screen size and tick rate as the recording
+        log = InputLog.load(args.replay)
+        ai = AlienInvasion(headless=args.fast, screen_size=log.screen_size)
+        ai.settings.tick_rate = log.tick_rate
+        if args.dirty_rects:
+            ai.settings.dirty_rect_rendering = True
+            ai.dirty_renderer = DirtyRectRenderer(ai)
+        if args.capture:
+            # a fast replay waits for the writer instead of dropping frames
+            ai.capture = FrameCapture(ai, args.capture, args.capture_format,
+                                      every=args.capture_every, wait=args.fast)
+        if args.memory_report:
+            ai.memory = MemoryTracker(ai, waves=args.memory_waves)
+        try:
+            ai.run_replay(log, realtime=not args.fast)
+        finally:
+            if ai.capture:
+                ai.capture.close()
+                print('capture:', ai.capture.stats())
+            if ai.dirty_renderer:
+                print('dirty rects:', ai.dirty_renderer.stats())
+            if ai.memory:
+                _save_memory_report(ai.memory, args.memory_report)
+        print(f'ticks: {ai.ticks}  score: {ai.stats.score}  '
+              f'level: {ai.stats.level}  ships left: {ai.stats.ships_left}')
+        sys.exit()
+
     # Make a game instance and run the game
     # if block: it only runs if the file is called directly
-    ai = AlienInvasion()
-    ai.run_game()
\ No newline at end of file
+    store = None if args.no_save else StatsStore(args.stats_db)
+    ai = AlienInvasion(store=store, playfield_size=args.playfield)
+    if args.fps is not None:
+        ai.settings.frame_rate = args.fps
+    if args.tick_rate:
+        ai.settings.tick_rate = args.tick_rate
+    if args.startup_report:
+        for stage, total, ms in ai.startup_report():
+            print(f'{stage:<14} {ms:8.1f} ms   (at {total:8.1f} ms)')
+        sys.exit()
+    if args.blit_report:
+        for name, cost in blit_cost_report(ai).items():
+            print(f"{name:<18} before {cost['before_us']:>9.2f} us   after {cost['after_us']:>9.2f} us")
+        sys.exit()
+    if args.dirty_rects:
+        ai.settings.dirty_rect_rendering = True
+        ai.dirty_renderer = DirtyRectRenderer(ai)
+    if args.record:
+        ai.recorder = InputRecorder(ai.settings)
+    if args.profile:
+        ai.profiler = FrameProfiler()
+        ai.profiler.show_overlay = True
+    if args.capture:
+        ai.capture = FrameCapture(ai, args.capture, args.capture_format, every=args.capture_every)
+    if args.memory_report:
+        ai.memory = MemoryTracker(ai, waves=args.memory_waves)
+    loop = None
+    if args.async_loop:
+        # imported only when asked for -> asyncio stays out of the normal startup
+        from async_loop import AsyncGameLoop
+        loop = AsyncGameLoop(ai)
+    try:
+        if loop:
+            loop.run()
+        else:
+            ai.run_game()
+    finally:
+        # run_game only ends through sys.exit(), the async loop returns -> save the recording either way
+        if ai.recorder:
+            ai.recorder.save(args.record)
+        if ai.profiler and args.profile_out:
+            ai.profiler.export(args.profile_out)
+        if loop:
+            print('input latency:', loop.latency_stats())
+        if store:
+            store.close()
+        if ai.capture:
+            ai.capture.close()
+            print('capture:', ai.capture.stats())
+        if ai.dirty_renderer:
+            print('dirty rects:', ai.dirty_renderer.stats())
+        if ai.memory:
+            _save_memory_report(ai.memory, args.memory_report)
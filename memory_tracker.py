@@ -0,0 +1,164 @@
+import gc
+import json
+import tracemalloc
+from array import array
+from collections import Counter, deque
+
+import pygame # type: ignore
+
+from entities import SlotSprite
+from text_cache import cached_surfaces
+
+# Objects counted at every wave by type name (Surfaces are always counted too)
+COUNTED_TYPES = (pygame.sprite.Sprite, SlotSprite, pygame.sprite.AbstractGroup)
+
+# Allocations of the tracker itself are left out of the totals
+_IGNORED = (tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__))
+
+class MemoryTracker:
+    '''A class to check that memory stays flat from one wave to the next
+
+    wave() is called every time a new fleet is made (new game, cleared
+    level, ship hit). It takes a tracemalloc snapshot and counts the live
+    sprites, groups and Surfaces by type. Surface pixels are allocated by
+    SDL, not Python, so tracemalloc can't see them -> their bytes are
+    counted from the Surfaces themselves. Surfaces in the text cache's
+    LRU (score images, wider as the score grows, but never more than
+    cache_size of them) are counted apart in cached_surface_bytes and
+    not judged for growth.
+
+    Anything that grows at every one of the last `waves` waves is
+    reported as growing; the lines of code whose allocations grew most
+    over those waves come with the report.
+    '''
+
+    def __init__(self, ai_game, waves=5, frames=1, top=10):
+        '''Start tracing, waves = waves in a row a value must grow to be flagged'''
+        if waves < 1:
+            raise ValueError(f'waves must be at least 1, got {waves}')
+        self.ai_game = ai_game
+        self.waves = waves
+        self.top = top
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(frames)
+
+        # one row per wave
+        self.samples = []
+        # only the snapshots the growth window needs are kept -> the tracker itself stays flat
+        self._snapshots = deque(maxlen=waves + 1)
+
+    def wave(self):
+        '''Record memory and live object counts at the start of a wave'''
+        ai_game = self.ai_game
+        # cycles waiting for the collector aren't leaks
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        self._snapshots.append(snapshot)
+        counts, surface_bytes, cached_bytes = self._count_objects()
+        stats = ai_game.stats
+        tick, level, ships_left = _copies(ai_game.ticks, stats.level, stats.ships_left)
+        self.samples.append({
+            'wave': len(self.samples),
+            'tick': tick,
+            'level': level,
+            'ships_left': ships_left,
+            'traced_bytes': sum(stat.size for stat in snapshot.statistics('filename')),
+            'surface_bytes': surface_bytes,
+            'cached_surface_bytes': cached_bytes,
+            'counts': counts,
+        })
+
+    def enough_waves(self):
+        '''Return True once there are enough waves to judge growth'''
+        return len(self.samples) > self.waves
+
+    def growing(self):
+        '''Return {metric: [values]} for every metric that grew at each of the last waves'''
+        if not self.enough_waves():
+            return {}
+        window = self.samples[-self.waves - 1:]
+        metrics = {'traced_bytes': [sample['traced_bytes'] for sample in window],
+                   'surface_bytes': [sample['surface_bytes'] for sample in window]}
+        for name in window[-1]['counts']:
+            metrics[name] = [sample['counts'].get(name, 0) for sample in window]
+        return {name: values for name, values in metrics.items()
+                if all(before < after for before, after in zip(values, values[1:]))}
+
+    def top_growth(self):
+        '''Return the lines of code whose allocations grew most over the growth window'''
+        if len(self._snapshots) < 2:
+            return []
+        differences = self._snapshots[-1].compare_to(self._snapshots[0], 'lineno')
+        return [{'where': str(stat.traceback), 'size_diff': stat.size_diff,
+                 'count_diff': stat.count_diff}
+                for stat in differences[:self.top] if stat.size_diff > 0]
+
+    def report(self):
+        '''Return every wave's sample, the growing metrics and where the growth comes from
+
+        'flat' is None while there are too few waves to tell.
+        '''
+        growing = self.growing()
+        return {
+            'waves': len(self.samples),
+            'growth_window': self.waves,
+            'flat': not growing if self.enough_waves() else None,
+            'growing': growing,
+            'top_growth': self.top_growth(),
+            'samples': self.samples,
+        }
+
+    def save(self, path):
+        '''Write report() to path as JSON and return it'''
+        report = self.report()
+        with open(path, 'w') as out:
+            json.dump(report, out, indent=2)
+        return report
+
+    def close(self):
+        '''Stop tracing if this tracker started it'''
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @staticmethod
+    def _count_objects():
+        '''Return ({type name: live count}, bytes of Surface pixels, bytes of cached text pixels)
+
+        Sprites and groups are tracked by the garbage collector. Surfaces
+        aren't (they hold no references), so they are found through the
+        objects that refer to them.
+        '''
+        counts = Counter()
+        surfaces = {}
+        for obj in gc.get_objects():
+            if isinstance(obj, COUNTED_TYPES):
+                counts[type(obj).__name__] += 1
+            for referent in gc.get_referents(obj):
+                if isinstance(referent, pygame.Surface):
+                    surfaces[id(referent)] = referent
+        for surface in surfaces.values():
+            counts[type(surface).__name__] += 1
+        cached = {id(surface) for surface in cached_surfaces()}
+        surface_bytes = cached_bytes = 0
+        for surface in surfaces.values():
+            # a subsurface shares its parent's pixels
+            if surface.get_parent() is not None:
+                continue
+            if id(surface) in cached:
+                cached_bytes += surface.get_height() * surface.get_pitch()
+            else:
+                surface_bytes += surface.get_height() * surface.get_pitch()
+        return dict(sorted(counts.items())), surface_bytes, cached_bytes
+
+def _copies(*values):
+    '''Return new int objects equal to values, allocated in this file
+
+    A sample must not keep the game's own int objects alive: they were
+    allocated in main.py, so one more of them per wave shows up there as
+    a leak (this file's allocations are filtered out). int(value) hands
+    back the very same object; a round trip through an array always
+    builds new ones.
+    '''
+    return array('q', values).tolist()
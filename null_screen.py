@@ -0,0 +1,33 @@
+import pygame # type: ignore
+
+class NullScreen:
+    '''A screen with a size but no pixels, for games that are never drawn
+
+    Ship, Fleet, Scoreboard and Button only read the screen's rect to
+    place themselves; the simulation never touches its pixels. A 1200x800
+    Surface costs almost 4 MB, so a host running hundreds of games gives
+    the ones nobody watches this instead. Drawing onto it is an error.
+    '''
+
+    def __init__(self, size):
+        '''Remember the size of the screen the game plays on'''
+        self._rect = pygame.Rect((0, 0), size)
+
+    def get_rect(self, **kwargs):
+        '''Return a new rect the size of the screen, like Surface.get_rect()'''
+        rect = self._rect.copy()
+        for name, value in kwargs.items():
+            setattr(rect, name, value)
+        return rect
+
+    def get_size(self):
+        '''Return (width, height)'''
+        return self._rect.size
+
+    def get_width(self):
+        '''Return the width in pixels'''
+        return self._rect.width
+
+    def get_height(self):
+        '''Return the height in pixels'''
+        return self._rect.height
@@ -0,0 +1,173 @@
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS high_score (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    score INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    level INTEGER,
+    score INTEGER,
+    ticks INTEGER,
+    seconds REAL
+);
+CREATE TABLE IF NOT EXISTS levels (
+    game_id INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    ticks INTEGER NOT NULL,
+    ships_left INTEGER NOT NULL,
+    PRIMARY KEY (game_id, level)
+);
+'''
+
+# Writes waiting in the queue: (sql, parameters)
+# :game is this process's own game number; the writer swaps in the row id SQLite gave the game
+_SAVE_HIGH_SCORE = ('INSERT INTO high_score (id, score) VALUES (1, :score) '
+                    'ON CONFLICT (id) DO UPDATE SET score = MAX(score, excluded.score)')
+_START_GAME = 'INSERT INTO games (started) VALUES (:started)'
+_END_GAME = ('UPDATE games SET level = :level, score = :score, ticks = :ticks, seconds = :seconds '
+             'WHERE id = :game')
+_END_LEVEL = ('INSERT OR REPLACE INTO levels VALUES '
+              '(:game, :level, :score, :ticks, :ships_left)')
+
+class StatsStore:
+    '''A class to keep high scores and per-game / per-level stats in SQLite
+
+    Everything the game needs is read once when the store opens (the high
+    score). After that the game thread only puts writes on a queue; a
+    background thread commits them in batches, so saving never blocks a
+    frame.
+
+    Game ids handed to the game are local to this store; SQLite assigns
+    the real row ids, so several instances can share one database. A
+    write that fails is reported on stderr and counted in errors, and the
+    writer carries on with the next one.
+    '''
+
+    def __init__(self, path, batch_size=64, flush_interval=1.0):
+        '''Open (or create) the database at path and start the writer thread'''
+        self.path = path
+        self.batch_size = batch_size
+        # longest time (seconds) a write waits before it is committed
+        self.flush_interval = flush_interval
+
+        connection = self._connect()
+        row = connection.execute('SELECT score FROM high_score WHERE id = 1').fetchone()
+        # Cached -> Scoreboard reads this, never the database
+        self.high_score = row[0] if row else 0
+        connection.close()
+
+        self._next_game_id = 1
+        # {local game id: games row id}, only used by the writer thread
+        self._row_ids = {}
+
+        self.writes = 0
+        self.commits = 0
+        self.errors = 0
+        self._pending = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name='stats-writer', daemon=True)
+        self._writer.start()
+
+    def save_high_score(self, score):
+        '''Queue a new high score'''
+        if score > self.high_score:
+            self.high_score = score
+            self._pending.put((_SAVE_HIGH_SCORE, {'score': score}))
+
+    def start_game(self):
+        '''Queue a new game row and return its (local) id'''
+        game_id = self._next_game_id
+        self._next_game_id += 1
+        self._pending.put((_START_GAME, {'game': game_id, 'started': time.time()}))
+        return game_id
+
+    def end_level(self, game_id, level, score, ticks, ships_left):
+        '''Queue the stats of a cleared level, ticks = ticks spent on it'''
+        self._pending.put((_END_LEVEL, {'game': game_id, 'level': level, 'score': score,
+                                        'ticks': ticks, 'ships_left': ships_left}))
+
+    def end_game(self, game_id, level, score, ticks, seconds):
+        '''Queue the final level, score and length of a game'''
+        self._pending.put((_END_GAME, {'game': game_id, 'level': level, 'score': score,
+                                       'ticks': ticks, 'seconds': seconds}))
+
+    def close(self):
+        '''Commit everything still queued and stop the writer thread'''
+        if self._writer.is_alive():
+            self._pending.put(None)
+            self._writer.join()
+
+    def _connect(self):
+        '''Open a connection in WAL mode and make sure the tables exist'''
+        connection = sqlite3.connect(self.path)
+        # WAL -> readers never wait on the writer, commits are cheap appends
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _write_loop(self):
+        '''Writer thread: commit queued writes in batches until close()'''
+        connection = self._connect()
+        running = True
+        while running:
+            # wait for the first write, then take whatever else is queued
+            batch = [self._pending.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            if batch[-1] is None:
+                running = False
+                batch.pop()
+            if batch:
+                self._commit(connection, batch)
+        connection.close()
+
+    def _commit(self, connection, batch):
+        '''Commit batch in one transaction; if that fails, write by write'''
+        try:
+            with connection:
+                for write in batch:
+                    self._execute(connection, *write)
+        except sqlite3.Error:
+            # the transaction was rolled back -> save whatever can still be saved
+            for write in batch:
+                try:
+                    with connection:
+                        self._execute(connection, *write)
+                except sqlite3.Error as error:
+                    self.errors += 1
+                    print(f'stats store: write lost ({error})', file=sys.stderr)
+                else:
+                    self.writes += 1
+                    self.commits += 1
+        else:
+            self.writes += len(batch)
+            self.commits += 1
+
+    def _execute(self, connection, sql, parameters):
+        '''Run one queued write, turning local game ids into row ids'''
+        if sql == _START_GAME:
+            cursor = connection.execute(sql, parameters)
+            self._row_ids[parameters['game']] = cursor.lastrowid
+            return
+        if 'game' in parameters:
+            row_id = self._row_ids.get(parameters['game'])
+            if row_id is None:
+                raise sqlite3.IntegrityError(f"game {parameters['game']} was never saved")
+            parameters = {**parameters, 'game': row_id}
+        connection.execute(sql, parameters)
@@ -0,0 +1,108 @@
+import csv
+import json
+from collections import deque
+from time import perf_counter_ns
+
+import pygame # type: ignore
+
+from assets import assets
+
+# Phases of one pass through the main loop, in order
+PHASES = ('events', 'ship', 'bullets', 'aliens', 'screen')
+
+class FrameProfiler:
+    '''A class to time each phase of every frame and keep rolling statistics
+
+    Phases are timed with perf_counter_ns. The last `window` frames feed
+    the p50/p95/p99 figures and the optional on-screen overlay; every
+    frame is also kept as a sample row for export() at exit.
+    '''
+
+    def __init__(self, window=600, overlay_interval=30):
+        '''Initialize empty histories, window = frames the percentiles cover'''
+        self.history = {phase: deque(maxlen=window) for phase in PHASES + ('frame',)}
+        # per-frame rows: (frame, events, ship, bullets, aliens, screen, frame total) in ns
+        self.samples = []
+        self._current = dict.fromkeys(PHASES, 0)
+        self._frame_start = perf_counter_ns()
+
+        # Overlay - re-rendered every overlay_interval frames, not every frame
+        self.show_overlay = False
+        self.overlay_interval = overlay_interval
+        self._overlay = None
+        self._font = None
+
+    def lap(self, phase, start):
+        '''Add the time since start to phase, return now -> start of the next phase'''
+        now = perf_counter_ns()
+        self._current[phase] += now - start
+        return now
+
+    def end_frame(self):
+        '''Close the current frame and store its sample'''
+        now = perf_counter_ns()
+        total = now - self._frame_start
+        self._frame_start = now
+
+        row = [len(self.samples)]
+        for phase in PHASES:
+            self.history[phase].append(self._current[phase])
+            row.append(self._current[phase])
+            self._current[phase] = 0
+        self.history['frame'].append(total)
+        row.append(total)
+        self.samples.append(tuple(row))
+
+    def percentiles(self, phase):
+        '''Return (p50, p95, p99) of phase over the rolling window, in ms'''
+        times = sorted(self.history[phase])
+        if not times:
+            return (0.0, 0.0, 0.0)
+        last = len(times) - 1
+        return tuple(times[round(last * p)] / 1e6 for p in (0.50, 0.95, 0.99))
+
+    def summary(self):
+        '''Return {phase: {'p50': ms, 'p95': ms, 'p99': ms}} for the rolling window'''
+        return {phase: dict(zip(('p50', 'p95', 'p99'), self.percentiles(phase)))
+                for phase in self.history}
+
+    def draw_overlay(self, surface, ai_game):
+        '''Draw the statistics panel at the bottom left of surface, return its rect'''
+        if self._overlay is None or len(self.samples) % self.overlay_interval == 0:
+            self._overlay = self._render_overlay(ai_game)
+        rect = self._overlay.get_rect(bottomleft=(10, surface.get_height() - 10))
+        surface.blit(self._overlay, rect)
+        return rect
+
+    def export(self, path):
+        '''Write every frame sample to path, as JSON if it ends in .json else CSV'''
+        columns = ('frame',) + tuple(f'{phase}_ns' for phase in PHASES) + ('total_ns',)
+        with open(path, 'w', newline='') as out:
+            if path.endswith('.json'):
+                json.dump({'columns': columns, 'samples': self.samples,
+                           'summary_ms': self.summary()}, out)
+            else:
+                writer = csv.writer(out)
+                writer.writerow(columns)
+                writer.writerows(self.samples)
+
+    def _render_overlay(self, ai_game):
+        '''Render the statistics panel, same size every time -> it always covers the last one'''
+        if self._font is None:
+            self._font = assets.font(None, 24)
+        lines = [
+            f'fps {ai_game.clock.get_fps():5.1f}   aliens {len(ai_game.aliens)}'
+            f'   bullets {len(ai_game.bullets)}',
+            'phase      p50    p95    p99 (ms)',
+        ]
+        for phase in PHASES + ('frame',):
+            p50, p95, p99 = self.percentiles(phase)
+            lines.append(f'{phase:<8} {p50:6.2f} {p95:6.2f} {p99:6.2f}')
+
+        line_height = self._font.get_linesize()
+        panel = pygame.Surface((340, line_height * len(lines) + 10))
+        panel.fill((0, 0, 0))
+        for number, line in enumerate(lines):
+            text = self._font.render(line, True, (255, 255, 255), (0, 0, 0))
+            panel.blit(text, (5, 5 + number * line_height))
+        return panel
@@ -0,0 +1,119 @@
+import struct
+
+from game_input import TickInput
+
+# File layout: header, then (run length varint, input bits byte) pairs
+MAGIC = b'AIRP'
+VERSION = 1
+# magic, version, tick rate, screen width, screen height
+HEADER = struct.Struct('<4sBHHH')
+
+# One bit per input in the packed byte
+LEFT, RIGHT, FIRE, PLAY = 1, 2, 4, 8
+
+def pack_input(inputs):
+    '''Pack a TickInput into one byte'''
+    return ((LEFT if inputs.left else 0) | (RIGHT if inputs.right else 0)
+            | (FIRE if inputs.fire else 0) | (PLAY if inputs.play else 0))
+
+def unpack_input(bits):
+    '''Turn a packed byte back into a TickInput'''
+    return TickInput(bool(bits & LEFT), bool(bits & RIGHT),
+                     bool(bits & FIRE), bool(bits & PLAY))
+
+class InputRecorder:
+    '''A class to record the input of every tick in a compact binary log
+
+    Each tick's input is packed into one byte and runs of identical bytes
+    are stored once with their length, so holding an arrow key for a
+    minute costs a few bytes.
+    '''
+
+    def __init__(self, settings):
+        '''Start an empty recording for a game with these settings'''
+        self.tick_rate = settings.tick_rate
+        self.screen_size = (settings.screen_width, settings.screen_height)
+        # [[bits, count], ...]
+        self.runs = []
+        self.ticks = 0
+
+    def record(self, inputs):
+        '''Append the input used for one tick'''
+        bits = pack_input(inputs)
+        if self.runs and self.runs[-1][0] == bits:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([bits, 1])
+        self.ticks += 1
+
+    def to_bytes(self):
+        '''Return the whole recording in the binary log format'''
+        data = bytearray(HEADER.pack(MAGIC, VERSION, self.tick_rate, *self.screen_size))
+        for bits, count in self.runs:
+            _write_varint(data, count)
+            data.append(bits)
+        return bytes(data)
+
+    def save(self, path):
+        '''Write the recording to path'''
+        with open(path, 'wb') as log_file:
+            log_file.write(self.to_bytes())
+
+class InputLog:
+    '''A recorded session that can be fed back into the game tick by tick'''
+
+    def __init__(self, tick_rate, screen_size, runs):
+        '''Hold the recorded settings and the (bits, count) runs'''
+        self.tick_rate = tick_rate
+        self.screen_size = screen_size
+        self.runs = runs
+        self.ticks = sum(count for bits, count in runs)
+
+    @classmethod
+    def from_bytes(cls, data):
+        '''Parse a log made by InputRecorder.to_bytes()'''
+        magic, version, tick_rate, width, height = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not an Alien Invasion input log')
+
+        runs = []
+        position = HEADER.size
+        while position < len(data):
+            count, position = _read_varint(data, position)
+            runs.append((data[position], count))
+            position += 1
+        return cls(tick_rate, (width, height), runs)
+
+    @classmethod
+    def load(cls, path):
+        '''Read the log stored at path'''
+        with open(path, 'rb') as log_file:
+            return cls.from_bytes(log_file.read())
+
+    def __len__(self):
+        return self.ticks
+
+    def __iter__(self):
+        '''Yield one TickInput per recorded tick'''
+        for bits, count in self.runs:
+            inputs = unpack_input(bits)
+            for _ in range(count):
+                yield inputs
+
+def _write_varint(data, value):
+    '''Append value as an unsigned LEB128 varint'''
+    while value >= 0x80:
+        data.append((value & 0x7f) | 0x80)
+        value >>= 7
+    data.append(value)
+
+def _read_varint(data, position):
+    '''Read an unsigned LEB128 varint, return (value, next position)'''
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
@@ -1,6 +1,5 @@
-import pygame.font # type: ignore
-from pygame.sprite import Group # type: ignore
-from ship import Ship
+from assets import assets
+from text_cache import glyph_renderer
 
 class Scoreboard:
     '''A class to report scoring information'''
@@ -15,7 +14,13 @@ class Scoreboard:
 
         # Font settings for scoring information
         self.text_color = (30,30,30)
-        self.font = pygame.font.SysFont(None, 48)
+        # one font instance shared with the Play button
+        self.font = assets.font(None, 48)
+        # Numbers are composed from cached digit glyphs instead of font.render each time
+        self.text = glyph_renderer(self.font, self.text_color, self.settings.bg_color)
+
+        # One ship icon surface is shared by every ship left
+        self.ship_image = assets.image('images/ship2.bmp')
 
         # Prepare the initial score image
         self.prep_score()
@@ -30,10 +35,7 @@ class Scoreboard:
         # format = 10,000 (comma)
         score_str = f'{rounded_score:,}'
         # turn numerical value (score) into a string -> pass to render() which creates an image
-        # render(,True,,) -> smoothen letters in font?
-        self.score_image = self.font.render(
-            score_str, True, self.text_color, self.settings.bg_color
-        )
+        self.score_image = self.text.render(score_str)
 
         # Display score at the top right of screen
         self.score_rect = self.score_image.get_rect()
@@ -45,15 +47,13 @@ class Scoreboard:
         self.screen.blit(self.score_image, self.score_rect)
         self.screen.blit(self.high_score_image, self.high_score_rect)
         self.screen.blit(self.level_image, self.level_rect)
-        self.ships.draw(self.screen)
+        self.screen.blits([(self.ship_image, rect) for rect in self.ship_rects], False)
 
     def prep_high_score(self):
         '''Turn high score into a rendered image'''
         high_score = round(self.stats.high_score, -1)
         high_score_str = f'{high_score:,}'
-        self.high_score_image = self.font.render(
-            high_score_str, True, self.text_color, self.settings.bg_color
-            )
+        self.high_score_image = self.text.render(high_score_str)
         
         # Center high score at top of screen
         self.high_score_rect = self.high_score_image.get_rect()
@@ -65,13 +65,14 @@ class Scoreboard:
         if self.stats.score > self.stats.high_score:
             self.stats.high_score = self.stats.score
             self.prep_high_score()
+            # only queued here, the store's writer thread does the saving
+            if self.ai_game.store:
+                self.ai_game.store.save_high_score(self.stats.score)
 
     def prep_level(self):
         '''Turn the level into a rendered image'''
         level_str = str(self.stats.level)
-        self.level_image = self.font.render(
-            level_str, True, self.text_color, self.settings.bg_color
-        )
+        self.level_image = self.text.render(level_str)
 
         # Position level below score
         self.level_rect = self.level_image.get_rect()
@@ -80,10 +81,12 @@ class Scoreboard:
 
     def prep_ships(self):
         '''Show how many ships left'''
-        self.ships = Group()
+        # only the positions change -> every icon is drawn with self.ship_image
+        ship_width = self.ship_image.get_width()
+        self.ship_rects = []
         # a loop runs once for every ship player has left
         for ship_number in range(self.stats.ships_left):
-            ship = Ship(self.ai_game)
-            ship.rect.x = 10 + ship_number * ship.rect.width
-            ship.rect.y = 10
-            self.ships.add(ship)
\ No newline at end of file
+            rect = self.ship_image.get_rect()
+            rect.x = 10 + ship_number * ship_width
+            rect.y = 10
+            self.ship_rects.append(rect)
\ No newline at end of file
@@ -0,0 +1,320 @@
+'''Host many independent games in one process
+
+Every session is its own headless AlienInvasion (with no surface unless
+--render is given). All sessions are ticked round-robin on one fixed
+schedule, and their inputs come from a local socket or a pipe:
+
+    python session_host.py --socket /tmp/alien.sock
+        each connection is one session; every byte received is a packed
+        input (replay.pack_input bits, held until the next byte) and '?'
+        asks for a JSON state line back
+    bots | python session_host.py --pipe --sessions 100
+        lines 'SESSION BITS' set a session's input, 'SESSION ?' prints its state
+    python session_host.py --bots 300 --duration 10
+        300 in-process bots, then a latency / throughput report
+'''
+import argparse
+import json
+import os
+import random
+import selectors
+import socket
+import stat
+import sys
+from collections import deque
+from time import perf_counter, perf_counter_ns
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from main import AlienInvasion
+from game_input import TickInput
+from replay import unpack_input
+from batch import PILOTS
+
+# Byte / word a client sends to ask for its session's state
+STATE_QUERY = b'?'
+
+class Session:
+    '''One hosted game and the input that drives it'''
+
+    def __init__(self, session_id, game, window, pilot=None, seed=0):
+        '''Wrap game; pilot(tick, rng) -> TickInput drives a bot session'''
+        self.id = session_id
+        self.game = game
+        self.input = TickInput()
+        self.pilot = pilot
+        self.rng = random.Random(f'{seed}-{session_id}')
+        # where state replies go: a socket, or None for stdout
+        self.connection = None
+        # ns from the start of a host tick to this session's tick being done
+        self.latencies = deque(maxlen=window)
+
+    def next_input(self):
+        '''Return the input for this session's next tick'''
+        if self.pilot is None:
+            return self.input
+        game = self.game
+        # a bot starts a new game as soon as the last one is over
+        if not game.game_active:
+            return TickInput(play=True)
+        return self.pilot(game.ticks, self.rng)
+
+    def state(self):
+        '''Return the session's game state as a dictionary'''
+        game = self.game
+        return {'session': self.id, 'tick': game.ticks, 'active': game.game_active,
+                'score': game.stats.score, 'level': game.stats.level,
+                'ships_left': game.stats.ships_left}
+
+class SessionHost:
+    '''A class to run many games in one process, ticked round-robin
+
+    tick() steps every session once. The session that goes first moves
+    along by one each tick, so no session always waits for all the others.
+    Inputs are read between ticks with a selector (sockets and / or a
+    pipe), so one process needs no threads at all.
+    '''
+
+    def __init__(self, screen_size=(1200, 800), render=False, tick_rate=60, window=600):
+        '''Set up an empty host, tick_rate = 0 ticks as fast as possible'''
+        self.screen_size = screen_size
+        self.render = render
+        self.tick_rate = tick_rate
+        self.window = window
+        self.sessions = {}
+        self._next_id = 0
+        self._first = 0
+        self.selector = selectors.DefaultSelector()
+        self._pipe_buffer = b''
+
+        # Statistics
+        self.host_ticks = 0
+        self.session_ticks = 0
+        self.late_ticks = 0
+        self._started = perf_counter()
+
+    def add_session(self, pilot=None):
+        '''Create a new game session and return it'''
+        game = AlienInvasion(headless=True, screen_size=self.screen_size, render=self.render)
+        session = Session(self._next_id, game, self.window, pilot)
+        self.sessions[session.id] = session
+        self._next_id += 1
+        return session
+
+    def remove_session(self, session_id):
+        '''Drop a session and its game'''
+        session = self.sessions.pop(session_id, None)
+        if session and session.connection:
+            self.selector.unregister(session.connection)
+            session.connection.close()
+
+    def tick(self):
+        '''Step every session once, starting one further along than last time'''
+        start = perf_counter_ns()
+        sessions = list(self.sessions.values())
+        if sessions:
+            self._first %= len(sessions)
+            order = sessions[self._first:] + sessions[:self._first]
+            self._first += 1
+            for session in order:
+                game = session.game
+                game.step(session.next_input())
+                session.input.clear_actions()
+                if self.render:
+                    game._update_screen()
+                session.latencies.append(perf_counter_ns() - start)
+        self.host_ticks += 1
+        self.session_ticks += len(sessions)
+
+    # Inputs
+
+    def listen(self, address):
+        '''Accept sessions on a Unix socket path or a (host, port) TCP address'''
+        if isinstance(address, str):
+            if os.path.exists(address):
+                # only a stale socket from an earlier run is replaced, never an ordinary file
+                if not stat.S_ISSOCK(os.stat(address).st_mode):
+                    raise FileExistsError(f'{address} exists and is not a socket')
+                os.remove(address)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(address)
+        server.listen()
+        server.setblocking(False)
+        self.selector.register(server, selectors.EVENT_READ, self._accept)
+
+    def read_pipe(self, pipe=None):
+        '''Take 'SESSION BITS' / 'SESSION ?' lines from pipe (default: stdin)'''
+        pipe = pipe or sys.stdin.buffer
+        os.set_blocking(pipe.fileno(), False)
+        self.selector.register(pipe, selectors.EVENT_READ, self._read_pipe)
+
+    def poll(self, timeout):
+        '''Handle every input waiting, for up to timeout seconds'''
+        for key, _ in self.selector.select(timeout):
+            key.data(key.fileobj)
+
+    def _accept(self, server):
+        '''A client connected -> give it its own session'''
+        connection, _ = server.accept()
+        connection.setblocking(False)
+        session = self.add_session()
+        session.connection = connection
+        self.selector.register(connection, selectors.EVENT_READ,
+                               lambda conn, session=session: self._read_socket(session))
+
+    def _read_socket(self, session):
+        '''Apply the bytes a client sent, end the session when it disconnects'''
+        try:
+            data = session.connection.recv(4096)
+        except ConnectionError:
+            data = b''
+        if not data:
+            self.remove_session(session.id)
+            return
+        for byte in data:
+            if byte == STATE_QUERY[0]:
+                self._reply(session)
+            else:
+                self._set_input(session, byte)
+
+    def _read_pipe(self, pipe):
+        '''Apply every complete line that came through the pipe'''
+        data = os.read(pipe.fileno(), 65536)
+        if not data:
+            # writer closed the pipe -> stop listening to it
+            self.selector.unregister(pipe)
+            return
+        lines = (self._pipe_buffer + data).split(b'\n')
+        self._pipe_buffer = lines.pop()
+        for line in lines:
+            fields = line.split()
+            if len(fields) != 2 or not fields[0].isdigit():
+                continue
+            session = self.sessions.get(int(fields[0]))
+            if session is None:
+                continue
+            if fields[1] == STATE_QUERY:
+                self._reply(session)
+            elif fields[1].isdigit():
+                self._set_input(session, int(fields[1]))
+
+    def _set_input(self, session, bits):
+        '''Hold the packed input until the next one; fire / play count once'''
+        new = unpack_input(bits)
+        # a fire or play not used by a tick yet is kept
+        new.fire = new.fire or session.input.fire
+        new.play = new.play or session.input.play
+        session.input = new
+
+    def _reply(self, session):
+        '''Send the session's state to its socket, or print it for the pipe'''
+        line = (json.dumps(session.state()) + '\n').encode()
+        if session.connection:
+            try:
+                session.connection.sendall(line)
+            except (BlockingIOError, ConnectionError):
+                # a client that doesn't read its replies doesn't hold up the host
+                pass
+        else:
+            sys.stdout.buffer.write(line)
+            sys.stdout.flush()
+
+    # Main loop
+
+    def serve(self, duration=None):
+        '''Tick on schedule and read inputs in between, for duration seconds (or forever)'''
+        self._started = perf_counter()
+        end = self._started + duration if duration else None
+        tick_seconds = 1 / self.tick_rate if self.tick_rate else 0.0
+        next_tick = self._started
+        while end is None or perf_counter() < end:
+            now = perf_counter()
+            self.poll(max(0.0, next_tick - now) if tick_seconds else 0)
+            if perf_counter() < next_tick:
+                continue
+            self.tick()
+            next_tick += tick_seconds
+            if tick_seconds and perf_counter() > next_tick + tick_seconds:
+                # a whole tick behind -> count it and start the schedule again from now
+                self.late_ticks += 1
+                next_tick = perf_counter()
+
+    def report(self):
+        '''Return per-session tick latency and aggregate throughput'''
+        elapsed = perf_counter() - self._started
+        per_session = {}
+        everything = []
+        for session in self.sessions.values():
+            times = sorted(session.latencies)
+            everything.extend(times)
+            if times:
+                per_session[session.id] = {
+                    'p50_ms': _percentile(times, 0.50), 'p95_ms': _percentile(times, 0.95),
+                    'max_ms': times[-1] / 1e6, **session.state()}
+        everything.sort()
+        return {
+            'sessions': len(self.sessions),
+            'seconds': round(elapsed, 3),
+            'host_ticks': self.host_ticks,
+            'late_ticks': self.late_ticks,
+            'session_ticks_per_sec': round(self.session_ticks / elapsed, 1) if elapsed else 0.0,
+            'tick_latency_ms': {'p50': _percentile(everything, 0.50),
+                                'p95': _percentile(everything, 0.95),
+                                'p99': _percentile(everything, 0.99)},
+            'per_session': per_session,
+        }
+
+def _percentile(sorted_ns, fraction):
+    '''Return the fraction percentile of a sorted list of ns, in ms'''
+    if not sorted_ns:
+        return 0.0
+    return round(sorted_ns[round((len(sorted_ns) - 1) * fraction)] / 1e6, 3)
+
+def main():
+    '''Read the command line, host the sessions and print the report'''
+    parser = argparse.ArgumentParser(description='Alien Invasion session host')
+    parser.add_argument('--socket', metavar='PATH', help='accept sessions on a Unix socket')
+    parser.add_argument('--port', type=int, help='accept sessions on 127.0.0.1:PORT')
+    parser.add_argument('--pipe', action='store_true', help='read session inputs from stdin')
+    parser.add_argument('--sessions', type=int, default=0,
+                        help='sessions to create up front, driven through the pipe')
+    parser.add_argument('--bots', type=int, default=0, help='in-process bot sessions')
+    parser.add_argument('--pilot', choices=list(PILOTS), default='random', help='how bots play')
+    parser.add_argument('--tick-rate', type=int, default=60,
+                        help='host ticks per second, 0 = as fast as possible')
+    parser.add_argument('--render', action='store_true',
+                        help='give every session an off-screen surface and draw it each tick')
+    parser.add_argument('--duration', type=float, help='stop after this many seconds')
+    parser.add_argument('--full-report', action='store_true', help='include every session')
+    args = parser.parse_args()
+
+    host = SessionHost(render=args.render, tick_rate=args.tick_rate)
+    for _ in range(args.sessions):
+        host.add_session()
+    for _ in range(args.bots):
+        host.add_session(pilot=PILOTS[args.pilot])
+    if args.socket:
+        try:
+            host.listen(args.socket)
+        except FileExistsError as error:
+            parser.error(str(error))
+    if args.port:
+        host.listen(('127.0.0.1', args.port))
+    if args.pipe:
+        host.read_pipe()
+
+    try:
+        host.serve(args.duration)
+    except KeyboardInterrupt:
+        pass
+    report = host.report()
+    if not args.full_report:
+        del report['per_session']
+    print(json.dumps(report, indent=2), file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+from difficulty import Difficulty, difficulty_table
+
 class Settings:
     '''A class to store all settings for Alien Invasion'''
 
@@ -5,15 +7,42 @@ class Settings:
         '''Initialize the game static settings'''
         
         # Screen settings
+        # size of the playfield the game logic runs on; full screen scales it to the monitor
         self.screen_width = 1200
         self.screen_height = 800
+        # False -> full screen makes the playfield as big as the monitor (more aliens on bigger screens)
+        self.fixed_playfield = True
 
         # Set background color, black as default
         # colors in Pygame are specified as RGB colors (red-green-blue), ranging from 0 to 255
         self.bg_color = (230,230,230)
 
+        # Simulation settings
+        # the game logic advances in fixed ticks of 1 / tick_rate seconds (30, 60, 144 ...)
+        self.tick_rate = 60
+        # most real time (ms) one frame catches up on; a longer stall is skipped, not raced through
+        self.max_catch_up_ms = 250
+        # Speeds below are pixels per 1/speed_reference_rate second
+        # -> every tick moves things speed * dt * speed_reference_rate, whatever the tick_rate
+        self.speed_reference_rate = 60
+        # Frames drawn per second at most, 0 = uncapped (the simulation still ticks at tick_rate)
+        self.frame_rate = 60
+
+        # Rendering settings
+        # True -> redraw and push only changed rects instead of fill + flip every frame
+        self.dirty_rect_rendering = False
+        # True -> full frames are drawn with one blits() call from a sprite atlas (BatchRenderer)
+        self.batch_rendering = True
+        # True -> sprites become RLE-accelerated colorkey images blended onto bg_color
+        self.rle_sprites = False
+        # True -> clear the screen by blitting a pre-rendered background instead of fill()
+        # (fill() measured faster on SDL software surfaces, check with main.py --blit-report)
+        self.background_layer = False
+
         # Ship settings
         self.ship_limit = 3
+        # seconds the game freezes after the ship is hit
+        self.ship_hit_pause = 0.5
 
         # Bullet settings
         self.bullet_width = 3
@@ -30,25 +59,31 @@ class Settings:
         # How quickly the alien point values increase
         self.score_scale = 1.5
 
+        # Speeds and alien points of level 1 (speeds in pixels every 1/60 second)
+        # change it with level_one._replace(...) before a game starts
+        self.level_one = Difficulty(level=1, ship_speed=5.5, bullet_speed=2.5,
+                                    alien_speed=1.0, alien_points=50)
+        # Difficulty is worked out up to this level, later levels stay at it
+        self.max_level = 100
+
         self.initialize_dynamic_settings()
 
     def initialize_dynamic_settings(self):
         '''Initialize settings that change throughout the game'''
-        self.ship_speed = 5.5 # 1.5 pixels on each pass through the loop
-        self.bullet_speed = 2.5
-        self.alien_speed = 1.0
+        # Every level's speeds and points, frozen -> shared by every game with the same settings
+        self.difficulty_table = difficulty_table(
+            self.level_one, self.speedup_scale, self.score_scale, self.max_level
+        )
+        # Difficulty record of the current level, everything reads its speeds from here
+        self.difficulty = self.difficulty_table[0]
 
         # Fleet_direction of 1 represents right, -1 respresents left
         self.fleet_direction = 1
 
-        # Scoring settings
-        self.alien_points = 50
-
     def increase_speed(self):
-        '''Increase speed settings of ship, bullet, alien each time player reaches new level'''
-        self.ship_speed *= self.speedup_scale
-        self.bullet_speed *= self.speedup_scale
-        self.alien_speed *= self.speedup_scale
+        '''Increase speed of ship, bullet, alien and the alien points -> next level'''
+        self.set_level(self.difficulty.level + 1)
 
-        # and alien point values
-        self.alien_points = int(self.alien_points * self.score_scale)
+    def set_level(self, level):
+        '''Switch to the difficulty of level (capped at max_level)'''
+        self.difficulty = self.difficulty_table[min(max(level, 1), self.max_level) - 1]
@@ -1,6 +1,7 @@
-import pygame # type: ignore
 from pygame.sprite import Sprite # type: ignore
 
+from assets import assets
+
 class Ship(Sprite):
     '''A class to manage the ship'''
 
@@ -17,7 +18,7 @@ class Ship(Sprite):
         self.screen_rect = ai_game.screen.get_rect()
 
         # Load the ship image and get its rect -> return a surface representing the ship
-        self.image = pygame.image.load('images/ship2.bmp')
+        self.image = assets.image('images/ship2.bmp')
         # access the ship surface's rect attribute -> later use to place the ship
         self.rect = self.image.get_rect()
 
@@ -31,17 +32,26 @@ class Ship(Sprite):
         self.moving_right = False
         self.moving_left = False
 
-    def update(self):
-        '''Update the ship's position based on the movement flag'''
+    def update(self, scale=1.0):
+        '''Update the ship's position based on the movement flag
+
+        scale = length of this tick in 1/speed_reference_rate seconds
+        '''
+        # no move is longer than the screen is wide; late levels are faster than
+        # that and would push the rect past its integer range
+        distance = min(self.settings.difficulty.ship_speed * scale, self.screen_rect.width)
+
         # Update the ship x value, not the rect
         if self.moving_right and self.rect.right < self.screen_rect.right:
             # self.rect.x += 1
-            self.x += self.settings.ship_speed
+            self.x += distance
         # use if instead of elif: avoid right key being prioritized
         # top left corner of screen has coordinate of (0,0), increase as you move down or right
         if self.moving_left and self.rect.left > 0:
             # self.rect.x -= 1
-            self.x -= self.settings.ship_speed
+            self.x -= distance
+        # keep the whole ship on the screen
+        self.x = min(max(self.x, 0.0), float(self.screen_rect.right - self.rect.width))
 
         # Update rect object from self.x
         # self.rect.x will only keep the integer part of the position (ie. 1.5 -> 1)
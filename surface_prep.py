@@ -0,0 +1,55 @@
+from time import perf_counter_ns
+
+import pygame # type: ignore
+
+from assets import assets
+
+def make_background(screen, color):
+    '''Return a display-format surface of the screen's size filled with color'''
+    background = assets.to_display(pygame.Surface(screen.get_size()))
+    background.fill(color)
+    return background
+
+def blit_cost_report(ai_game, repeats=200):
+    '''Time blits of raw vs display-format surfaces on the game screen
+
+    Returns {name: {'before_us': ..., 'after_us': ...}} - the average
+    microseconds per blit of the surface straight from disk / the font,
+    and of the prepared surface the game actually draws with.
+    '''
+    screen = ai_game.screen
+    settings = ai_game.settings
+    cases = {
+        'alien': (pygame.image.load('images/alien.bmp'), ai_game.aliens.image),
+        'ship': (pygame.image.load('images/ship2.bmp'), ai_game.ship.image),
+        'play_button_text': (
+            ai_game.play_button.font.render('Play', True, ai_game.play_button.text_color,
+                                            ai_game.play_button.button_color),
+            ai_game.play_button.msg_image,
+        ),
+        'score_text': (
+            ai_game.sb.font.render('1,234,560', True, ai_game.sb.text_color, settings.bg_color),
+            ai_game.sb.text.render('1,234,560'),
+        ),
+    }
+
+    report = {}
+    for name, (raw, prepared) in cases.items():
+        report[name] = {
+            'before_us': _time_us(lambda: screen.blit(raw, (0, 0)), repeats),
+            'after_us': _time_us(lambda: screen.blit(prepared, (0, 0)), repeats),
+        }
+    # clearing the screen: full fill vs one blit of the background layer
+    background = ai_game.background or make_background(screen, settings.bg_color)
+    report['background'] = {
+        'before_us': _time_us(lambda: screen.fill(settings.bg_color), repeats),
+        'after_us': _time_us(lambda: screen.blit(background, (0, 0)), repeats),
+    }
+    return report
+
+def _time_us(draw, repeats):
+    '''Average microseconds one call of draw takes'''
+    start = perf_counter_ns()
+    for _ in range(repeats):
+        draw()
+    return round((perf_counter_ns() - start) / repeats / 1000, 2)
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+
+import pygame # type: ignore
+
+from assets import assets
+
+# Characters a formatted score / level is made of
+NUMBER_CHARS = '0123456789,'
+
+class GlyphRenderer:
+    '''Render number strings from glyphs that are rasterized only once
+
+    Each digit and the comma are rendered by the font once. A number is
+    then built by blitting those glyph surfaces side by side, and whole
+    strings are kept in a small LRU cache, so re-showing a recent score
+    costs nothing at all.
+    '''
+
+    def __init__(self, font, text_color, bg_color, cache_size=64):
+        '''Pre-render the glyphs for font in the given colors'''
+        self.font = font
+        self.text_color = text_color
+        self.bg_color = bg_color
+        self.cache_size = cache_size
+
+        # glyphs in the display format -> composing a number never converts pixels
+        self.glyphs = {char: assets.to_display(font.render(char, True, text_color, bg_color))
+                       for char in NUMBER_CHARS}
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+
+        # {text: surface}, least recently used first
+        self._strings = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text):
+        '''Return a surface showing text, like font.render(text, True, text_color, bg_color)'''
+        surface = self._strings.get(text)
+        if surface is not None:
+            self.hits += 1
+            self._strings.move_to_end(text)
+            return surface
+
+        self.misses += 1
+        if all(char in self.glyphs for char in text):
+            surface = self._compose(text)
+        else:
+            # anything that isn't a number goes through the font as usual
+            surface = assets.to_display(
+                self.font.render(text, True, self.text_color, self.bg_color)
+            )
+
+        self._strings[text] = surface
+        if len(self._strings) > self.cache_size:
+            self._strings.popitem(last=False)
+        return surface
+
+    def _compose(self, text):
+        '''Build the surface for text from the cached glyphs'''
+        glyphs = [self.glyphs[char] for char in text]
+        surface = pygame.Surface((sum(glyph.get_width() for glyph in glyphs), self.height))
+        surface.fill(self.bg_color)
+
+        x = 0
+        placed = []
+        for glyph in glyphs:
+            placed.append((glyph, (x, 0)))
+            x += glyph.get_width()
+        surface.blits(placed, False)
+        return surface
+
+# One renderer per (font, colors), shared by every scoreboard using them
+_renderers = {}
+
+def glyph_renderer(font, text_color, bg_color):
+    '''Return the shared GlyphRenderer for font drawn in the given colors'''
+    key = (id(font), text_color, bg_color)
+    renderer = _renderers.get(key)
+    # the renderer holds the font -> its id can't be reused while cached
+    if renderer is None or renderer.font is not font:
+        renderer = GlyphRenderer(font, text_color, bg_color)
+        _renderers[key] = renderer
+    return renderer
+
+def cached_surfaces():
+    '''Return the string surfaces held by every renderer's LRU cache (bounded by cache_size)'''
+    return [surface for renderer in _renderers.values() for surface in renderer._strings.values()]